@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the kernels below are plain NumPy too
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+
+@njit(cache=True)
+def top_k_indices(values: np.ndarray, k: int) -> np.ndarray:
+    """Return the indices of the k largest values, largest first.
+
+    The sort is stable, so equal values keep their original order (the same
+    order `sorted(..., reverse=True)` gives for a counts dict).
+    """
+    order = np.argsort(-values, kind="mergesort")
+    return order[:k]
+
+
+@njit(cache=True)
+def phases_from_bits(bits: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Weight each row of a 0/1 bit matrix and sum it into a phase value."""
+    return (bits * weights).sum(axis=1)
+
+
+@njit(cache=True)
+def gf2_row_reduce(rows: np.ndarray, n: int) -> np.ndarray:
+    """Gauss-Jordan eliminate bit-packed GF(2) rows in place, highest column first.
+
+    `rows` is a (m, words) uint64 matrix with column c at bit c % 64 of word
+    c // 64. Returns, for each of the n columns, the index of its pivot row
+    in the reduced matrix, or -1 for a free column.
+    """
+    m, words = rows.shape
+    pivots = np.full(n, -1, dtype=np.int64)
+    one = np.uint64(1)
+    rank = 0
+    for col in range(n - 1, -1, -1):
+        if rank == m:
+            break
+        word = col // 64
+        shift = np.uint64(col % 64)
+        pivot = -1
+        for r in range(rank, m):
+            if (rows[r, word] >> shift) & one:
+                pivot = r
+                break
+        if pivot < 0:
+            continue
+        for w in range(words):
+            rows[rank, w], rows[pivot, w] = rows[pivot, w], rows[rank, w]
+        # Clear this column from every other row
+        for r in range(m):
+            if r != rank and (rows[r, word] >> shift) & one:
+                for w in range(words):
+                    rows[r, w] ^= rows[rank, w]
+        pivots[col] = rank
+        rank += 1
+    return pivots
+
+
+@njit(cache=True)
+def parities(values: np.ndarray, mask: np.uint64) -> np.ndarray:
+    """Return the parity of popcount(value & mask) for each uint64 value (y · s mod 2)."""
+    folded = values & mask
+    for shift in (32, 16, 8, 4, 2, 1):
+        folded ^= folded >> np.uint64(shift)
+    return folded & np.uint64(1)
+
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from typing import Dict, List, Sequence
+
+import numpy as np
+from qiskit import QuantumCircuit, transpile
+from qiskit_aer import AerSimulator
+
+
+# Per-run options for circuits built from repeated structured blocks
+# (Grover iterations, inverse QFT). Aer's default only fuses gates from 14
+# qubits up; these circuits benefit from fusion well below that.
+FUSION_RUN_OPTIONS = {"fusion_enable": True, "fusion_threshold": 5, "fusion_max_qubit": 5}
+
+
+@lru_cache(maxsize=1)
+def gpu_available() -> bool:
+    """Return True if this Aer build can simulate on a GPU."""
+    return "GPU" in AerSimulator().available_devices()
+
+
+@lru_cache(maxsize=1)
+def get_backend() -> AerSimulator:
+    """Return the shared Aer simulator backend.
+
+    The backend is built once per process so that every `run_*` helper
+    reuses the same handle. The demo circuits have no need for double
+    precision, so the statevector is kept in single precision (half the
+    memory traffic per gate) and placed on the GPU when one is available.
+    Independent experiments submitted together run concurrently, and on a
+    GPU the shots of one experiment are batched into a single kernel launch.
+    The options are fixed here once rather than passed on every run.
+    """
+    return AerSimulator(
+        method="statevector",
+        precision="single",
+        device="GPU" if gpu_available() else "CPU",
+        max_parallel_threads=0,
+        max_parallel_experiments=os.cpu_count() or 1,
+        batched_shots_gpu=True,
+        fusion_enable=True,
+    )
+
+
+@lru_cache(maxsize=1)
+def _native_operations() -> frozenset:
+    # Barriers are directives Aer accepts even though the target does not list them
+    return frozenset(get_backend().target.operation_names) | {"barrier"}
+
+
+def runs_natively(qc: QuantumCircuit) -> bool:
+    """Return True if every instruction in `qc` is one Aer executes directly.
+
+    Such circuits can be passed to `backend.run` without transpiling.
+    """
+    native = _native_operations()
+    return all(inst.operation.name in native for inst in qc.data)
+
+
+def compile_for_backend(qc: QuantumCircuit) -> QuantumCircuit:
+    """Return `qc` ready to run on the shared backend.
+
+    Aer has no coupling map and executes standard gates itself (fusing them
+    internally), so a circuit that `runs_natively` is returned unchanged.
+    Anything else is transpiled at optimization level 0.
+    """
+    if runs_natively(qc):
+        return qc
+    return transpile(qc, get_backend(), optimization_level=0)
+
+
+def counts_from_result(result, num_bits: int, index: int = 0) -> Dict[str, int]:
+    """Return the counts of experiment `index` keyed by `num_bits`-wide bitstrings.
+
+    Converts Aer's raw hex-keyed counts directly instead of going through
+    `result.get_counts()`, which re-parses the experiment header for every
+    key. Only valid for circuits with a single classical register.
+    """
+    hex_counts = result.data(index)["counts"]
+    return {format(int(key, 16), f"0{num_bits}b"): count for key, count in hex_counts.items()}
+
+
+def run_batch(
+    circuits: Sequence[QuantumCircuit], shots: int, exact: bool = False, **run_options
+) -> List[Dict[str, int]]:
+    """Run several compiled circuits as one simulator job and return their counts in order.
+
+    Submitting the circuits together lets Aer run them as parallel
+    experiments. With `exact=True` the circuits must carry saved
+    probabilities (see `with_saved_probabilities`) and each entry is
+    `exact_counts` for that experiment. `run_options` are forwarded to
+    `backend.run`.
+    """
+    result = get_backend().run(list(circuits), shots=shots, **run_options).result()
+    if exact:
+        return [exact_counts(result, shots, i) for i in range(len(circuits))]
+    return [result.get_counts(i) for i in range(len(circuits))]
+
+
+def with_saved_probabilities(qc: QuantumCircuit) -> QuantumCircuit:
+    """Return a copy of `qc` whose final measurements are replaced by `save_probabilities`.
+
+    The saved probabilities cover the measured qubits in classical-bit order,
+    so index i of the result corresponds to the counts key format(i, "0nb").
+    """
+    measured: Dict[int, int] = {}
+    for inst in qc.data:
+        if inst.operation.name == "measure":
+            measured[qc.find_bit(inst.clbits[0]).index] = qc.find_bit(inst.qubits[0]).index
+    exact = qc.remove_final_measurements(inplace=False)
+    exact.save_probabilities([measured[clbit] for clbit in sorted(measured)])
+    return exact
+
+
+def exact_counts(result, shots: int, index: int = 0) -> Dict[str, int]:
+    """Turn the saved probabilities of experiment `index` into integer counts.
+
+    Counts are scaled to `shots` with largest-remainder rounding so they still
+    sum to `shots`, which keeps the printing helpers' output meaningful.
+    """
+    return probabilities_to_counts(result.data(index)["probabilities"], shots)
+
+
+def probabilities_to_counts(probabilities, shots: int) -> Dict[str, int]:
+    """Scale a probability vector over 2^n basis states to integer counts summing to `shots`.
+
+    Index i maps to the counts key format(i, "0nb"); zero counts are dropped.
+    """
+    probs = np.asarray(probabilities, dtype=np.float64)
+    probs = probs / probs.sum()
+    num_bits = len(probs).bit_length() - 1
+
+    raw = probs * shots
+    counts = np.floor(raw).astype(np.int64)
+    remainder = shots - int(counts.sum())
+    if remainder > 0:
+        counts[np.argsort(counts - raw, kind="stable")[:remainder]] += 1
+    return {format(i, f"0{num_bits}b"): int(c) for i, c in enumerate(counts) if c > 0}
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-import argparse
-import math
+from functools import lru_cache
 from typing import Dict
 
 from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer
+
+from _sim import exact_counts, get_backend, with_saved_probabilities
 
 
 def apply_oracle_2_qubits(qc: QuantumCircuit, target: str) -> None:
@@ -20,11 +20,13 @@ def apply_oracle_2_qubits(qc: QuantumCircuit, target: str) -> None:
 
     num_qubits = 2
 
-    # Map bitstring to qubits: leftmost bit -> qubit 1, rightmost -> qubit 0
-    for qubit in range(num_qubits):
-        bit = target[num_qubits - 1 - qubit]
-        if bit == "0":
-            qc.x(qubit)
+    # Map bitstring to qubits: leftmost bit -> qubit 1, rightmost -> qubit 0,
+    # so bit i of int(target, 2) is the state of qubit i
+    mask = int(target, 2)
+    flips = [qubit for qubit in range(num_qubits) if not (mask >> qubit) & 1]
+    # For target '11' there is nothing to flip, so the X layers are skipped
+    if flips:
+        qc.x(flips)
 
     # Apply CZ to flip the phase of |11>
     qc.h(1)
@@ -32,10 +34,8 @@ def apply_oracle_2_qubits(qc: QuantumCircuit, target: str) -> None:
     qc.h(1)
 
     # Uncompute the X gates
-    for qubit in range(num_qubits):
-        bit = target[num_qubits - 1 - qubit]
-        if bit == "0":
-            qc.x(qubit)
+    if flips:
+        qc.x(flips)
 
 
 def apply_diffusion_2_qubits(qc: QuantumCircuit) -> None:
@@ -51,12 +51,8 @@ def apply_diffusion_2_qubits(qc: QuantumCircuit) -> None:
     qc.h([0, 1])
 
 
-def run_baby_grover_2_qubits(target: str, shots: int = 1024) -> Dict[str, int]:
-    """Run a single-iteration Grover search on 2 qubits for the given target.
-
-    For N = 4 states, optimal Grover iterations ≈ π/4 * sqrt(N) ≈ 1,
-    so 1 iteration is enough to significantly boost the target state's probability.
-    """
+def build_baby_grover_circuit(target: str) -> QuantumCircuit:
+    """Build the measured single-iteration Grover circuit on 2 qubits."""
     qc = QuantumCircuit(2)
 
     # Start in equal superposition over all 4 states
@@ -69,11 +65,29 @@ def run_baby_grover_2_qubits(target: str, shots: int = 1024) -> Dict[str, int]:
     apply_diffusion_2_qubits(qc)
 
     qc.measure_all()
+    return qc
+
+
+@lru_cache(maxsize=8)
+def _compiled_baby_grover_circuit(target: str, exact: bool = False) -> QuantumCircuit:
+    compiled = transpile(build_baby_grover_circuit(target), get_backend())
+    return with_saved_probabilities(compiled) if exact else compiled
+
 
-    backend = Aer.get_backend("aer_simulator")
-    compiled = transpile(qc, backend)
-    job = backend.run(compiled, shots=shots)
+def run_baby_grover_2_qubits(target: str, shots: int = 1024, exact: bool = False) -> Dict[str, int]:
+    """Run a single-iteration Grover search on 2 qubits for the given target.
+
+    For N = 4 states, optimal Grover iterations ≈ π/4 * sqrt(N) ≈ 1,
+    so 1 iteration is enough to significantly boost the target state's probability.
+
+    With `exact=True` the simulator saves the output probabilities instead of
+    sampling, and the returned counts are those probabilities scaled to `shots`.
+    """
+    backend = get_backend()
+    job = backend.run(_compiled_baby_grover_circuit(target, exact), shots=shots)
     result = job.result()
+    if exact:
+        return exact_counts(result, shots)
     counts: Dict[str, int] = result.get_counts()
     return counts
 
@@ -89,6 +103,8 @@ def print_counts_and_probabilities(counts: Dict[str, int], shots: int, highlight
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Baby Grover search on 2 qubits")
     parser.add_argument(
         "--target",
@@ -97,6 +113,11 @@ def main() -> None:
         help="2-bit target string in {00,01,10,11} (default: 11)",
     )
     parser.add_argument("--shots", type=int, default=1024, help="Number of shots (>=1)")
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Report the exact output distribution scaled to --shots instead of sampling",
+    )
 
     args = parser.parse_args()
 
@@ -106,7 +127,7 @@ def main() -> None:
     if args.shots <= 0:
         raise SystemExit("--shots must be >= 1")
 
-    counts = run_baby_grover_2_qubits(target=target, shots=args.shots)
+    counts = run_baby_grover_2_qubits(target=target, shots=args.shots, exact=args.exact)
 
     print(f"\nBaby Grover search on 2 qubits for target state: {target}")
     print_counts_and_probabilities(counts, args.shots, highlight=target)
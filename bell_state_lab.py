@@ -1,14 +1,15 @@
 from __future__ import annotations
 
-import argparse
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Tuple
 
 from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer
 
+from _sim import exact_counts, get_backend, run_batch, with_saved_probabilities
 
-def run_bell_state(shots: int = 1024) -> Dict[str, int]:
-    """Create and measure a Bell state (maximally entangled)."""
+
+def build_bell_circuit() -> QuantumCircuit:
+    """Build the measured Bell state circuit (maximally entangled)."""
     qc = QuantumCircuit(2)
 
     # Create Bell state (|00> + |11>) / sqrt(2)
@@ -16,17 +17,11 @@ def run_bell_state(shots: int = 1024) -> Dict[str, int]:
     qc.cx(0, 1)
 
     qc.measure_all()
+    return qc
 
-    backend = Aer.get_backend("aer_simulator")
-    compiled = transpile(qc, backend)
-    job = backend.run(compiled, shots=shots)
-    result = job.result()
-    counts: Dict[str, int] = result.get_counts()
-    return counts
 
-
-def run_product_superposition(shots: int = 1024) -> Dict[str, int]:
-    """Create a product state H⊗H (no entanglement)."""
+def build_product_circuit() -> QuantumCircuit:
+    """Build the measured product state circuit H⊗H (no entanglement)."""
     qc = QuantumCircuit(2)
 
     # Independent superposition on each qubit: (|0>+|1>)⊗(|0>+|1>) / 2
@@ -34,15 +29,61 @@ def run_product_superposition(shots: int = 1024) -> Dict[str, int]:
     qc.h(1)
 
     qc.measure_all()
+    return qc
+
+
+@lru_cache(maxsize=2)
+def _compiled_bell_circuit(exact: bool = False) -> QuantumCircuit:
+    compiled = transpile(build_bell_circuit(), get_backend())
+    return with_saved_probabilities(compiled) if exact else compiled
 
-    backend = Aer.get_backend("aer_simulator")
-    compiled = transpile(qc, backend)
-    job = backend.run(compiled, shots=shots)
+
+@lru_cache(maxsize=2)
+def _compiled_product_circuit(exact: bool = False) -> QuantumCircuit:
+    compiled = transpile(build_product_circuit(), get_backend())
+    return with_saved_probabilities(compiled) if exact else compiled
+
+
+def run_bell_state(shots: int = 1024, exact: bool = False) -> Dict[str, int]:
+    """Create and measure a Bell state (maximally entangled).
+
+    With `exact=True` the simulator saves the output probabilities instead of
+    sampling, and the returned counts are those probabilities scaled to `shots`.
+    """
+    backend = get_backend()
+    job = backend.run(_compiled_bell_circuit(exact), shots=shots)
     result = job.result()
+    if exact:
+        return exact_counts(result, shots)
     counts: Dict[str, int] = result.get_counts()
     return counts
 
 
+def run_product_superposition(shots: int = 1024, exact: bool = False) -> Dict[str, int]:
+    """Create a product state H⊗H (no entanglement).
+
+    `exact` behaves as in `run_bell_state`.
+    """
+    backend = get_backend()
+    job = backend.run(_compiled_product_circuit(exact), shots=shots)
+    result = job.result()
+    if exact:
+        return exact_counts(result, shots)
+    counts: Dict[str, int] = result.get_counts()
+    return counts
+
+
+def run_bell_and_product(shots: int = 1024, exact: bool = False) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Run the Bell and product circuits together as a single simulator job.
+
+    Returns (bell_counts, product_counts). `exact` behaves as in `run_bell_state`.
+    """
+    bell_counts, product_counts = run_batch(
+        [_compiled_bell_circuit(exact), _compiled_product_circuit(exact)], shots, exact
+    )
+    return bell_counts, product_counts
+
+
 def print_counts_and_probabilities(title: str, counts: Dict[str, int], shots: int) -> None:
     print(f"\n=== {title} ===")
     print("Raw counts:")
@@ -54,6 +95,8 @@ def print_counts_and_probabilities(title: str, counts: Dict[str, int], shots: in
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Bell state vs product state demo")
     parser.add_argument(
         "--mode",
@@ -63,18 +106,26 @@ def main() -> None:
         help="Which circuit(s) to run: bell, product, or both (default)",
     )
     parser.add_argument("--shots", type=int, default=1024, help="Number of shots (>=1)")
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Report the exact output distribution scaled to --shots instead of sampling",
+    )
 
     args = parser.parse_args()
 
     if args.shots <= 0:
         raise SystemExit("--shots must be >= 1")
 
-    if args.mode in ("bell", "both"):
-        bell_counts = run_bell_state(shots=args.shots)
+    if args.mode == "both":
+        bell_counts, product_counts = run_bell_and_product(shots=args.shots, exact=args.exact)
         print_counts_and_probabilities("Bell state (entangled)", bell_counts, args.shots)
-
-    if args.mode in ("product", "both"):
-        product_counts = run_product_superposition(shots=args.shots)
+        print_counts_and_probabilities("Product H⊗H state (not entangled)", product_counts, args.shots)
+    elif args.mode == "bell":
+        bell_counts = run_bell_state(shots=args.shots, exact=args.exact)
+        print_counts_and_probabilities("Bell state (entangled)", bell_counts, args.shots)
+    else:
+        product_counts = run_product_superposition(shots=args.shots, exact=args.exact)
         print_counts_and_probabilities("Product H⊗H state (not entangled)", product_counts, args.shots)
 
 
@@ -1,27 +1,54 @@
 from __future__ import annotations
 
-import argparse
+from functools import lru_cache
 from typing import Dict
 
 from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer
+
+from _sim import get_backend
 
 
 def apply_oracle_bv(qc: QuantumCircuit, secret: str) -> None:
     """Apply the Bernstein–Vazirani oracle for a given secret bitstring.
 
     Qubit layout:
-      - qubits 0..n-1: input register
-      - qubit n: ancilla
+      - qubits 0..n-1: input register (no ancilla)
 
     f(x) = a · x (mod 2), where a is the secret bitstring.
-    The oracle marks f(x) into the ancilla with CNOT gates.
+    With an ancilla in |−⟩, CNOTs from the '1' bits of a would kick the
+    phase (−1)^f(x) back onto the inputs. That phase is just a Z on each
+    of those inputs, so the oracle applies it directly.
     """
+    # secret string assumed most-significant bit first; map to qubits 0..n-1
+    secret_mask = int(secret, 2)
+    marked = [i for i in range(len(secret)) if (secret_mask >> i) & 1]
+    if marked:
+        qc.z(marked)
+
+
+def build_bernstein_vazirani_circuit(secret: str) -> QuantumCircuit:
+    """Build the Bernstein–Vazirani circuit measuring the input register."""
     n = len(secret)
-    for i, bit in enumerate(reversed(secret)):
-        # secret string assumed most-significant bit first; map to qubits 0..n-1
-        if bit == "1":
-            qc.cx(i, n)
+    qc = QuantumCircuit(n, n)
+
+    # Apply H to the input register
+    qc.h(range(n))
+
+    # Phase oracle encodes f(x) = a · x as (−1)^f(x)
+    apply_oracle_bv(qc, secret)
+
+    # Apply H on input register again
+    qc.h(range(n))
+
+    # Measure input register
+    qc.measure(range(n), range(n))
+
+    return qc
+
+
+@lru_cache(maxsize=64)
+def _compiled_bernstein_vazirani_circuit(secret: str) -> QuantumCircuit:
+    return transpile(build_bernstein_vazirani_circuit(secret), get_backend())
 
 
 def run_bernstein_vazirani(secret: str, shots: int = 1024) -> Dict[str, int]:
@@ -34,30 +61,8 @@ def run_bernstein_vazirani(secret: str, shots: int = 1024) -> Dict[str, int]:
     if shots <= 0:
         raise ValueError("shots must be >= 1")
 
-    n = len(secret)
-    qc = QuantumCircuit(n + 1, n)
-
-    # Prepare ancilla in |1>
-    qc.x(n)
-
-    # Apply H to all qubits (inputs + ancilla)
-    for i in range(n + 1):
-        qc.h(i)
-
-    # Oracle encodes f(x) = a · x into ancilla
-    apply_oracle_bv(qc, secret)
-
-    # Apply H on input register again
-    for i in range(n):
-        qc.h(i)
-
-    # Measure input register
-    for i in range(n):
-        qc.measure(i, i)
-
-    backend = Aer.get_backend("aer_simulator")
-    compiled = transpile(qc, backend)
-    job = backend.run(compiled, shots=shots)
+    backend = get_backend()
+    job = backend.run(_compiled_bernstein_vazirani_circuit(secret), shots=shots)
     result = job.result()
     counts: Dict[str, int] = result.get_counts()
     return counts
@@ -84,6 +89,8 @@ def print_bv_results(counts: Dict[str, int], secret: str, shots: int) -> None:
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Bernstein–Vazirani algorithm demo")
     parser.add_argument("--secret", type=str, default="1011", help="Secret bitstring a (e.g. 1011)")
     parser.add_argument("--shots", type=int, default=1024, help="Number of shots (>=1)")
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-import argparse
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 
 from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer
+from qiskit.circuit import Barrier
+from qiskit.circuit.library import get_standard_gate_name_mapping
+
+from _sim import get_backend
 
 
 GATE_HELP = """Available commands (type then Enter):
@@ -20,13 +23,70 @@ GATE_HELP = """Available commands (type then Enter):
 """
 
 
+# Transpiled circuits keyed by their register layout and instruction sequence,
+# so repeated `run` commands on an unchanged circuit skip the transpiler.
+_COMPILED_CACHE: Dict[Tuple, QuantumCircuit] = {}
+_COMPILED_CACHE_SIZE = 64
+
+# Operations fully identified by name and params. Anything else (custom gates,
+# library blocks) may share a name with a different definition.
+_STANDARD_OPERATIONS = {
+    name: op.base_class for name, op in get_standard_gate_name_mapping().items()
+}
+_STANDARD_OPERATIONS["barrier"] = Barrier
+
+
+def _circuit_key(qc: QuantumCircuit) -> Optional[Tuple]:
+    """Return a hashable key for `qc`, or None if it cannot be cached.
+
+    Only circuits made of standard operations with hashable parameters are
+    cached; a custom gate's name does not identify its definition.
+    """
+    for inst in qc.data:
+        if _STANDARD_OPERATIONS.get(inst.operation.name) is not inst.operation.base_class:
+            return None
+    ops = tuple(
+        (
+            inst.operation.name,
+            tuple(qc.find_bit(q).index for q in inst.qubits),
+            tuple(qc.find_bit(c).index for c in inst.clbits),
+            tuple(inst.operation.params),
+        )
+        for inst in qc.data
+    )
+    key = (qc.num_qubits, tuple(creg.size for creg in qc.cregs), ops)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+@lru_cache(maxsize=None)
+def _measure_block(num_qubits: int) -> QuantumCircuit:
+    """Measure qubit i into classical bit i for every qubit."""
+    block = QuantumCircuit(num_qubits, num_qubits)
+    block.measure(range(num_qubits), range(num_qubits))
+    return block
+
+
 def run_circuit(qc: QuantumCircuit, shots: int = 1024) -> Dict[str, int]:
-    backend = Aer.get_backend("aer_simulator")
-    qc_to_run = qc.copy()
-    # Ensure we measure all qubits if there are no measurements yet
-    if qc_to_run.num_clbits == 0:
-        qc_to_run.measure_all()
-    compiled = transpile(qc_to_run, backend)
+    backend = get_backend()
+    key = _circuit_key(qc)
+    compiled = _COMPILED_CACHE.get(key) if key is not None else None
+    if compiled is None:
+        # Ensure we measure all qubits if there are no measurements yet.
+        # The user's circuit is never mutated, so it stays measurement-free.
+        if qc.num_clbits == 0:
+            qc_to_run = _measure_block(qc.num_qubits).compose(qc, front=True)
+        else:
+            qc_to_run = qc
+        compiled = transpile(qc_to_run, backend)
+        if key is not None:
+            if len(_COMPILED_CACHE) >= _COMPILED_CACHE_SIZE:
+                # Drop the oldest entry
+                del _COMPILED_CACHE[next(iter(_COMPILED_CACHE))]
+            _COMPILED_CACHE[key] = compiled
     job = backend.run(compiled, shots=shots)
     result = job.result()
     counts: Dict[str, int] = result.get_counts()
@@ -84,8 +144,7 @@ def interactive_playground(num_qubits: int, shots: int) -> None:
 def demo_playground(num_qubits: int, shots: int) -> None:
     """Non-interactive demo: H on all qubits then run."""
     qc = QuantumCircuit(num_qubits)
-    for i in range(num_qubits):
-        qc.h(i)
+    qc.h(range(num_qubits))
     print("Demo circuit:\n")
     print(qc.draw())
     counts = run_circuit(qc, shots=shots)
@@ -94,6 +153,8 @@ def demo_playground(num_qubits: int, shots: int) -> None:
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Quantum circuit playground")
     parser.add_argument("--qubits", type=int, default=2, help="Number of qubits (>=1)")
     parser.add_argument("--shots", type=int, default=1024, help="Number of shots for run/demo")
@@ -1,18 +1,24 @@
 from __future__ import annotations
 
-import argparse
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, List
 
 from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer
+
+from _sim import exact_counts, get_backend, run_batch, with_saved_probabilities
+
+
+ORACLE_TYPES = ["constant_zero", "constant_one", "balanced_first", "balanced_parity"]
 
 
 def apply_oracle_dj(qc: QuantumCircuit, n: int, oracle_type: str) -> None:
     """Apply a simple Deutsch–Jozsa oracle on the circuit.
 
     Qubit layout:
-      - qubits 0..n-1: input register
-      - qubit n: ancilla
+      - qubits 0..n-1: input register (no ancilla)
+
+    The oracle is applied in phase form, |x⟩ → (−1)^f(x) |x⟩, which is what
+    the usual XOR oracle does to the inputs when the ancilla is in |−⟩.
 
     Supported oracle types:
       - "constant_zero"  : f(x) = 0
@@ -24,61 +30,84 @@ def apply_oracle_dj(qc: QuantumCircuit, n: int, oracle_type: str) -> None:
         # f(x) = 0, do nothing
         return
     if oracle_type == "constant_one":
-        # f(x) = 1, flip ancilla for all inputs
-        qc.x(n)
+        # f(x) = 1, a global phase of −1: nothing observable to apply
         return
     if oracle_type == "balanced_first":
-        # f(x) = x_0, use CNOT from first input onto ancilla
-        qc.cx(0, n)
+        # f(x) = x_0, phase flip when the first input is 1
+        qc.z(0)
         return
     if oracle_type == "balanced_parity":
-        # f(x) = parity of all input bits
-        for i in range(n):
-            qc.cx(i, n)
+        # f(x) = parity of all input bits, a Z on every input
+        qc.z(range(n))
         return
 
     raise ValueError("Unsupported oracle_type for Deutsch–Jozsa")
 
 
-def run_deutsch_jozsa(n: int, oracle_type: str, shots: int = 1024) -> Dict[str, int]:
-    """Run the Deutsch–Jozsa algorithm on n input qubits.
+def build_deutsch_jozsa_circuit(n: int, oracle_type: str) -> QuantumCircuit:
+    """Build the Deutsch–Jozsa circuit measuring the n input qubits."""
+    # n input qubits only; the oracle acts by phase kickback
+    qc = QuantumCircuit(n, n)
 
-    Returns a counts dictionary over the measured input register.
-    """
-    if n <= 0:
-        raise ValueError("n must be >= 1")
-    if shots <= 0:
-        raise ValueError("shots must be >= 1")
-
-    # n input qubits + 1 ancilla, measure only the n input qubits
-    qc = QuantumCircuit(n + 1, n)
-
-    # Prepare ancilla in |1>
-    qc.x(n)
-
-    # Apply H to all qubits (inputs + ancilla)
-    for i in range(n + 1):
-        qc.h(i)
+    # Apply H to the input register
+    qc.h(range(n))
 
     # Oracle U_f
     apply_oracle_dj(qc, n, oracle_type)
 
     # Apply H on input register again
-    for i in range(n):
-        qc.h(i)
+    qc.h(range(n))
 
     # Measure input register
-    for i in range(n):
-        qc.measure(i, i)
+    qc.measure(range(n), range(n))
+
+    return qc
+
+
+@lru_cache(maxsize=64)
+def _compiled_deutsch_jozsa_circuit(n: int, oracle_type: str, exact: bool = False) -> QuantumCircuit:
+    compiled = transpile(build_deutsch_jozsa_circuit(n, oracle_type), get_backend())
+    return with_saved_probabilities(compiled) if exact else compiled
+
+
+def run_deutsch_jozsa(n: int, oracle_type: str, shots: int = 1024, exact: bool = False) -> Dict[str, int]:
+    """Run the Deutsch–Jozsa algorithm on n input qubits.
 
-    backend = Aer.get_backend("aer_simulator")
-    compiled = transpile(qc, backend)
-    job = backend.run(compiled, shots=shots)
+    Returns a counts dictionary over the measured input register. With
+    `exact=True` the counts are the exact output probabilities scaled to
+    `shots` rather than sampled.
+    """
+    if n <= 0:
+        raise ValueError("n must be >= 1")
+    if shots <= 0:
+        raise ValueError("shots must be >= 1")
+
+    backend = get_backend()
+    job = backend.run(_compiled_deutsch_jozsa_circuit(n, oracle_type, exact), shots=shots)
     result = job.result()
+    if exact:
+        return exact_counts(result, shots)
     counts: Dict[str, int] = result.get_counts()
     return counts
 
 
+def run_deutsch_jozsa_batch(
+    n: int, oracle_types: List[str], shots: int = 1024, exact: bool = False
+) -> List[Dict[str, int]]:
+    """Run Deutsch–Jozsa for several oracles as a single simulator job.
+
+    Returns one counts dictionary per entry of `oracle_types`, in order.
+    `exact` behaves as in `run_deutsch_jozsa`.
+    """
+    if n <= 0:
+        raise ValueError("n must be >= 1")
+    if shots <= 0:
+        raise ValueError("shots must be >= 1")
+
+    circuits = [_compiled_deutsch_jozsa_circuit(n, oracle_type, exact) for oracle_type in oracle_types]
+    return run_batch(circuits, shots, exact)
+
+
 def classify_deutsch_jozsa(counts: Dict[str, int], n: int) -> str:
     """Classify oracle as constant or balanced based on measurement results."""
     total = sum(counts.values())
@@ -106,21 +135,33 @@ def print_dj_results(counts: Dict[str, int], n: int, oracle_type: str, shots: in
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Deutsch–Jozsa algorithm demo")
     parser.add_argument("--n", type=int, default=2, help="Number of input qubits (>=1)")
     parser.add_argument(
         "--oracle",
         type=str,
-        choices=["constant_zero", "constant_one", "balanced_first", "balanced_parity"],
+        choices=ORACLE_TYPES + ["all"],
         default="balanced_parity",
-        help="Type of oracle function to use",
+        help="Type of oracle function to use ('all' runs every oracle in one batch)",
     )
     parser.add_argument("--shots", type=int, default=1024, help="Number of shots (>=1)")
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Report the exact output distribution scaled to --shots instead of sampling",
+    )
 
     args = parser.parse_args()
 
-    counts = run_deutsch_jozsa(n=args.n, oracle_type=args.oracle, shots=args.shots)
-    print_dj_results(counts, args.n, args.oracle, args.shots)
+    if args.oracle == "all":
+        all_counts = run_deutsch_jozsa_batch(n=args.n, oracle_types=ORACLE_TYPES, shots=args.shots, exact=args.exact)
+        for oracle_type, counts in zip(ORACLE_TYPES, all_counts):
+            print_dj_results(counts, args.n, oracle_type, args.shots)
+    else:
+        counts = run_deutsch_jozsa(n=args.n, oracle_type=args.oracle, shots=args.shots, exact=args.exact)
+        print_dj_results(counts, args.n, args.oracle, args.shots)
 
 
 if __name__ == "__main__":
@@ -1,11 +1,32 @@
 from __future__ import annotations
 
-import argparse
 import math
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict
 
 from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer
+from qiskit.circuit.library import MCXGate, UnitaryGate
+import numpy as np
+
+from _kernels import top_k_indices
+from _sim import (
+    FUSION_RUN_OPTIONS,
+    counts_from_result,
+    exact_counts,
+    get_backend,
+    with_saved_probabilities,
+)
+
+
+# Up to this many qubits the whole Grover loop is applied as one dense
+# 2^n x 2^n unitary instead of being built gate by gate.
+FUSED_GROVER_MAX_QUBITS = 8
+
+
+@lru_cache(maxsize=None)
+def _mcx_gate(n: int) -> MCXGate:
+    """Return a shared MCX gate with n - 1 controls, reused by every oracle/diffuser."""
+    return MCXGate(n - 1)
 
 
 def create_oracle(qc: QuantumCircuit, n: int, target: str) -> None:
@@ -16,10 +37,11 @@ def create_oracle(qc: QuantumCircuit, n: int, target: str) -> None:
         n: Number of qubits
         target: Target bitstring to mark
     """
-    # Flip qubits where target bit is 0
-    for i, bit in enumerate(reversed(target)):
-        if bit == "0":
-            qc.x(i)
+    # Flip qubits where target bit is 0 (none for the all-ones target)
+    mask = int(target, 2)
+    flips = [i for i in range(n) if not (mask >> i) & 1]
+    if flips:
+        qc.x(flips)
     
     # Multi-controlled Z gate
     if n == 1:
@@ -29,13 +51,20 @@ def create_oracle(qc: QuantumCircuit, n: int, target: str) -> None:
     else:
         # Use multi-controlled Z (MCZ)
         qc.h(n - 1)
-        qc.mcx(list(range(n - 1)), n - 1)
+        qc.append(_mcx_gate(n), list(range(n)))
         qc.h(n - 1)
     
     # Unflip qubits
-    for i, bit in enumerate(reversed(target)):
-        if bit == "0":
-            qc.x(i)
+    if flips:
+        qc.x(flips)
+
+
+@lru_cache(maxsize=64)
+def _oracle_circuit(n: int, target: str) -> QuantumCircuit:
+    """Return the oracle for `target` as a sub-circuit, built once and composed per iteration."""
+    oracle = QuantumCircuit(n)
+    create_oracle(oracle, n, target)
+    return oracle
 
 
 def create_diffusion_operator(qc: QuantumCircuit, n: int) -> None:
@@ -44,12 +73,10 @@ def create_diffusion_operator(qc: QuantumCircuit, n: int) -> None:
     This operator applies: 2|s⟩⟨s| - I where |s⟩ is uniform superposition.
     """
     # Apply H to all qubits
-    for i in range(n):
-        qc.h(i)
+    qc.h(range(n))
     
     # Apply X to all qubits
-    for i in range(n):
-        qc.x(i)
+    qc.x(range(n))
     
     # Multi-controlled Z gate
     if n == 1:
@@ -58,19 +85,66 @@ def create_diffusion_operator(qc: QuantumCircuit, n: int) -> None:
         qc.cz(0, 1)
     else:
         qc.h(n - 1)
-        qc.mcx(list(range(n - 1)), n - 1)
+        qc.append(_mcx_gate(n), list(range(n)))
         qc.h(n - 1)
     
     # Apply X to all qubits
-    for i in range(n):
-        qc.x(i)
+    qc.x(range(n))
     
     # Apply H to all qubits
-    for i in range(n):
-        qc.h(i)
+    qc.h(range(n))
+
+
+def grover_iterate_matrix(n: int, target: str) -> np.ndarray:
+    """Return one Grover iteration G = D·O as a dense 2^n x 2^n matrix.
+    
+    O flips the sign of the target basis state and D = 2|s⟩⟨s| - I is the
+    inversion about the uniform superposition |s⟩. This matches the
+    gate-level oracle and diffuser up to a global phase.
+    """
+    N = 2 ** n
+    grover = np.full((N, N), 2 / N) - np.eye(N)
+    # D·O just negates the column of the marked state
+    grover[:, int(target, 2)] *= -1
+    return grover
 
 
-def run_grover_search(n: int, target: str, iterations: int = None, shots: int = 1024) -> Dict[str, int]:
+def build_grover_circuit(n: int, target: str, iterations: int) -> QuantumCircuit:
+    """Build the measured Grover search circuit for a fixed iteration count."""
+    qc = QuantumCircuit(n, n)
+    
+    # Initialize to uniform superposition
+    qc.h(range(n))
+    
+    if n <= FUSED_GROVER_MAX_QUBITS:
+        # Apply all Grover iterations as a single precomputed unitary
+        grover_power = np.linalg.matrix_power(grover_iterate_matrix(n, target), iterations)
+        qc.append(UnitaryGate(grover_power, label=f"G^{iterations}"), range(n))
+    else:
+        # Apply Grover iteration
+        oracle = _oracle_circuit(n, target)
+        for _ in range(iterations):
+            # Oracle
+            qc.compose(oracle, inplace=True)
+            
+            # Diffusion operator
+            create_diffusion_operator(qc, n)
+    
+    # Measure all qubits
+    qc.measure(range(n), range(n))
+    
+    return qc
+
+
+@lru_cache(maxsize=64)
+def _compiled_grover_circuit(n: int, target: str, iterations: int, exact: bool = False) -> QuantumCircuit:
+    compiled = transpile(build_grover_circuit(n, target, iterations), get_backend())
+    return with_saved_probabilities(compiled) if exact else compiled
+
+
+def run_grover_search(
+    n: int, target: str, iterations: int = None, shots: int = 1024, exact: bool = False
+) -> Dict[str, int]:
     """Run Grover's search algorithm.
     
     Args:
@@ -78,6 +152,7 @@ def run_grover_search(n: int, target: str, iterations: int = None, shots: int =
         target: Target bitstring to search for
         iterations: Number of Grover iterations (auto-calculated if None)
         shots: Number of measurement shots
+        exact: Scale the exact output probabilities to `shots` instead of sampling
     
     Returns:
         Measurement counts
@@ -95,33 +170,13 @@ def run_grover_search(n: int, target: str, iterations: int = None, shots: int =
         iterations = int(math.pi / 4 * math.sqrt(N))
         iterations = max(1, iterations)
     
-    qc = QuantumCircuit(n, n)
-    
-    # Initialize to uniform superposition
-    for i in range(n):
-        qc.h(i)
-    
-    # Apply Grover iteration
-    for _ in range(iterations):
-        qc.barrier()
-        
-        # Oracle
-        create_oracle(qc, n, target)
-        
-        # Diffusion operator
-        create_diffusion_operator(qc, n)
-    
-    qc.barrier()
-    
-    # Measure all qubits
-    for i in range(n):
-        qc.measure(i, i)
-    
-    backend = Aer.get_backend("aer_simulator")
-    compiled = transpile(qc, backend)
-    job = backend.run(compiled, shots=shots)
+    compiled = _compiled_grover_circuit(n, target, iterations, exact)
+    backend = get_backend()
+    job = backend.run(compiled, shots=shots, **FUSION_RUN_OPTIONS)
     result = job.result()
-    counts: Dict[str, int] = result.get_counts()
+    if exact:
+        return exact_counts(result, shots)
+    counts: Dict[str, int] = counts_from_result(result, n)
     return counts
 
 
@@ -138,10 +193,14 @@ def print_grover_results(counts: Dict[str, int], target: str, n: int, iterations
     print(counts)
     
     print("\nTop measured states:")
-    sorted_counts = sorted(counts.items(), key=lambda x: x[1], reverse=True)
-    
-    for i, (state, count) in enumerate(sorted_counts[:10]):
-        prob = count / shots
+    states = list(counts.keys())
+    values = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    probs = values / shots
+    
+    for idx in top_k_indices(values, 10):
+        state = states[idx]
+        count = int(values[idx])
+        prob = probs[idx]
         marker = " ← target" if state == target else ""
         print(f"  |{state}⟩: {count:4d} / {shots} ≈ {prob:.3f}{marker}")
     
@@ -155,11 +214,18 @@ def print_grover_results(counts: Dict[str, int], target: str, n: int, iterations
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Grover's Search Algorithm")
     parser.add_argument("--n", type=int, default=3, help="Number of qubits (>=1)")
     parser.add_argument("--target", type=str, default=None, help="Target bitstring (e.g. '101')")
     parser.add_argument("--iterations", type=int, default=None, help="Number of Grover iterations (auto if not specified)")
     parser.add_argument("--shots", type=int, default=1024, help="Number of shots (>=1)")
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Report the exact output distribution scaled to --shots instead of sampling",
+    )
     
     args = parser.parse_args()
     
@@ -173,7 +239,8 @@ def main() -> None:
         n=args.n,
         target=target,
         iterations=args.iterations,
-        shots=args.shots
+        shots=args.shots,
+        exact=args.exact,
     )
     
     iterations_used = args.iterations if args.iterations else int(math.pi / 4 * math.sqrt(2 ** args.n))
@@ -1,9 +1,12 @@
+from functools import lru_cache
+
 from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer
+
+from _sim import get_backend
 
 # 1. Create a quantum circuit with 1 qubit
 
-def run_hello(shots: int = 1000):
+def build_hello_circuit() -> QuantumCircuit:
     qc = QuantumCircuit(1)
 
     # 2. Apply Hadamard gate to put the qubit into superposition
@@ -11,12 +14,19 @@ def run_hello(shots: int = 1000):
 
     # 3. Measure all qubits
     qc.measure_all()
+    return qc
 
-    # 4. Run on the Aer simulator
-    sim = Aer.get_backend("aer_simulator")
 
-    # Transpile for the backend
-    compiled_circuit = transpile(qc, sim)
+@lru_cache(maxsize=1)
+def _compiled_hello_circuit() -> QuantumCircuit:
+    # Transpile for the backend once; only the shot count varies between runs
+    return transpile(build_hello_circuit(), get_backend())
+
+
+def run_hello(shots: int = 1000):
+    # 4. Run on the Aer simulator
+    sim = get_backend()
+    compiled_circuit = _compiled_hello_circuit()
 
     job = sim.run(compiled_circuit, shots=shots)
     result = job.result()
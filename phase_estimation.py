@@ -1,13 +1,22 @@
 from __future__ import annotations
 
-import argparse
 import math
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, List
 
 from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer
+from qiskit.circuit.library import DiagonalGate
 import numpy as np
 
+from _kernels import phases_from_bits, top_k_indices
+from _sim import (
+    FUSION_RUN_OPTIONS,
+    counts_from_result,
+    exact_counts,
+    get_backend,
+    with_saved_probabilities,
+)
+
 
 def qft_dagger(qc: QuantumCircuit, n: int) -> None:
     """Apply inverse Quantum Fourier Transform on the first n qubits."""
@@ -26,25 +35,57 @@ def qft_dagger(qc: QuantumCircuit, n: int) -> None:
         qc.h(j)
 
 
-def apply_controlled_unitary(qc: QuantumCircuit, control_qubits: list, target_qubit: int, phase: float) -> None:
-    """Apply controlled-U^(2^k) gates where U is a phase gate.
+def apply_controlled_unitary(qc: QuantumCircuit, control_qubits: list, phase: float) -> None:
+    """Apply the controlled-U^(2^k) cascade where U is a phase gate.
+    
+    U|1⟩ = e^(2πiφ)|1⟩ where φ is the phase we want to estimate.
+    Since the eigenstate is |1⟩, controlled-U^(2^k) only kicks the phase
+    e^(2πi * 2^k * φ) back onto control qubit k. Together the cascade
+    multiplies counting state |j⟩ by e^(2πijφ), so it is applied as one
+    diagonal gate and the eigenstate qubit is not needed at all.
+    """
+    j = np.arange(2 ** len(control_qubits))
+    qc.append(DiagonalGate(np.exp(2j * np.pi * phase * j)), control_qubits)
+
+
+def build_phase_estimation_circuit(n_counting: int, phase: float) -> QuantumCircuit:
+    """Build the QPE circuit measuring the counting register.
     
-    U|ψ⟩ = e^(2πiφ)|ψ⟩ where φ is the phase we want to estimate.
-    U^(2^k) adds 2^k repetitions of the phase.
+    The eigenstate |1⟩ of U is folded into `apply_controlled_unitary`, so
+    the circuit only has the n_counting counting qubits.
     """
-    for k, control in enumerate(control_qubits):
-        # U^(2^k) = e^(2πi * 2^k * φ)
-        angle = 2 * math.pi * phase * (2 ** k)
-        qc.cp(angle, control, target_qubit)
+    qc = QuantumCircuit(n_counting, n_counting)
+    
+    # Apply Hadamard to counting qubits
+    qc.h(range(n_counting))
+    
+    # Apply controlled-U^(2^k) operations
+    control_qubits = list(range(n_counting))
+    apply_controlled_unitary(qc, control_qubits, phase)
+    
+    # Apply inverse QFT on counting register
+    qft_dagger(qc, n_counting)
+    
+    # Measure counting register
+    qc.measure(range(n_counting), range(n_counting))
+    
+    return qc
+
+
+@lru_cache(maxsize=64)
+def _compiled_phase_estimation_circuit(n_counting: int, phase: float, exact: bool = False) -> QuantumCircuit:
+    compiled = transpile(build_phase_estimation_circuit(n_counting, phase), get_backend())
+    return with_saved_probabilities(compiled) if exact else compiled
 
 
-def run_phase_estimation(n_counting: int, phase: float, shots: int = 1024) -> Dict[str, int]:
+def run_phase_estimation(n_counting: int, phase: float, shots: int = 1024, exact: bool = False) -> Dict[str, int]:
     """Run Quantum Phase Estimation algorithm.
     
     Args:
         n_counting: Number of counting qubits (precision = 1/2^n_counting)
         phase: The phase to estimate (between 0 and 1)
         shots: Number of measurement shots
+        exact: Scale the exact output probabilities to `shots` instead of sampling
     
     Returns:
         Measurement counts on counting register
@@ -56,50 +97,30 @@ def run_phase_estimation(n_counting: int, phase: float, shots: int = 1024) -> Di
     if shots <= 0:
         raise ValueError("shots must be >= 1")
     
-    # n_counting qubits for counting, 1 eigenstate qubit
-    n_total = n_counting + 1
-    qc = QuantumCircuit(n_total, n_counting)
-    
-    # Prepare eigenstate |1⟩ in the target qubit
-    target_qubit = n_counting
-    qc.x(target_qubit)
-    
-    # Apply Hadamard to counting qubits
-    for i in range(n_counting):
-        qc.h(i)
-    
-    qc.barrier()
-    
-    # Apply controlled-U^(2^k) operations
-    control_qubits = list(range(n_counting))
-    apply_controlled_unitary(qc, control_qubits, target_qubit, phase)
-    
-    qc.barrier()
-    
-    # Apply inverse QFT on counting register
-    qft_dagger(qc, n_counting)
-    
-    qc.barrier()
-    
-    # Measure counting register
-    for i in range(n_counting):
-        qc.measure(i, i)
-    
-    backend = Aer.get_backend("aer_simulator")
-    compiled = transpile(qc, backend)
-    job = backend.run(compiled, shots=shots)
+    compiled = _compiled_phase_estimation_circuit(n_counting, phase, exact)
+    backend = get_backend()
+    job = backend.run(compiled, shots=shots, **FUSION_RUN_OPTIONS)
     result = job.result()
-    counts: Dict[str, int] = result.get_counts()
+    if exact:
+        return exact_counts(result, shots)
+    counts: Dict[str, int] = counts_from_result(result, n_counting)
     return counts
 
 
 def binary_to_phase(binary_str: str) -> float:
     """Convert binary string to phase value (0.binary)."""
-    phase = 0.0
-    for i, bit in enumerate(binary_str):
-        if bit == "1":
-            phase += 1 / (2 ** (i + 1))
-    return phase
+    return int(binary_str, 2) / (1 << len(binary_str))
+
+
+def binary_strings_to_phases(states: List[str], n_counting: int) -> np.ndarray:
+    """Convert equal-length binary strings to phase values in one pass.
+
+    Equivalent to `binary_to_phase` applied to each state: the strings are
+    unpacked into a bit matrix and weighted by 2^-1, 2^-2, ..., 2^-n.
+    """
+    bits = np.frombuffer("".join(states).encode(), dtype=np.uint8).reshape(len(states), n_counting) - ord("0")
+    weights = 2.0 ** -np.arange(1, n_counting + 1)
+    return phases_from_bits(bits, weights)
 
 
 def print_phase_estimation_results(counts: Dict[str, int], true_phase: float, n_counting: int, shots: int) -> None:
@@ -111,21 +132,28 @@ def print_phase_estimation_results(counts: Dict[str, int], true_phase: float, n_
     print(counts)
     
     print("\nTop measured states and estimated phases:")
-    sorted_counts = sorted(counts.items(), key=lambda x: x[1], reverse=True)
-    
-    for i, (state, count) in enumerate(sorted_counts[:5]):
-        prob = count / shots
-        # Convert binary measurement to phase estimate
-        estimated_phase = binary_to_phase(state)
-        error = abs(estimated_phase - true_phase)
+    states = list(counts.keys())
+    values = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    probs = values / shots
+    order = top_k_indices(values, 5)
+    
+    # Convert all binary measurements to phase estimates at once
+    phases = binary_strings_to_phases(states, n_counting)
+    errors = np.abs(phases - true_phase)
+    
+    for i, idx in enumerate(order):
+        state = states[idx]
+        count = int(values[idx])
+        prob = probs[idx]
+        estimated_phase = phases[idx]
+        error = errors[idx]
         
         marker = " ← most probable" if i == 0 else ""
         print(f"  |{state}⟩: {count:4d} ({prob:.3f}) → φ ≈ {estimated_phase:.6f} (error: {error:.6f}){marker}")
     
     # Best estimate
-    best_state = sorted_counts[0][0]
-    best_estimate = binary_to_phase(best_state)
-    best_error = abs(best_estimate - true_phase)
+    best_estimate = phases[order[0]]
+    best_error = errors[order[0]]
     
     print(f"\nBest estimate: φ ≈ {best_estimate:.6f}")
     print(f"Absolute error: {best_error:.6f}")
@@ -133,17 +161,25 @@ def print_phase_estimation_results(counts: Dict[str, int], true_phase: float, n_
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Quantum Phase Estimation (QPE) demo")
     parser.add_argument("--n-counting", type=int, default=4, help="Number of counting qubits (>=1)")
     parser.add_argument("--phase", type=float, default=0.375, help="Phase to estimate (0 to 1)")
     parser.add_argument("--shots", type=int, default=1024, help="Number of shots (>=1)")
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="Report the exact output distribution scaled to --shots instead of sampling",
+    )
     
     args = parser.parse_args()
     
     counts = run_phase_estimation(
         n_counting=args.n_counting,
         phase=args.phase,
-        shots=args.shots
+        shots=args.shots,
+        exact=args.exact,
     )
     print_phase_estimation_results(counts, args.phase, args.n_counting, args.shots)
 
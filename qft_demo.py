@@ -1,49 +1,97 @@
 from __future__ import annotations
 
-import argparse
+import heapq
 import math
+from functools import lru_cache
+from operator import itemgetter
 from typing import Dict
 
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Statevector
 import numpy as np
 
+from _sim import probabilities_to_counts
 
-def qft(qc: QuantumCircuit, n: int) -> None:
-    """Apply Quantum Fourier Transform on the first n qubits of circuit qc.
-    
-    The QFT maps computational basis states to Fourier basis:
-    |j⟩ → (1/√N) Σ_k e^(2πijk/N) |k⟩
-    """
+
+@lru_cache(maxsize=32)
+def _qft_template(n: int) -> QuantumCircuit:
+    """Return the n-qubit QFT as a sub-circuit, with its rotation angles computed once."""
+    template = QuantumCircuit(n)
     for j in range(n):
         # Apply Hadamard to current qubit
-        qc.h(j)
+        template.h(j)
         
         # Apply controlled phase rotations
         for k in range(j + 1, n):
             angle = 2 * math.pi / (2 ** (k - j + 1))
-            qc.cp(angle, k, j)
+            template.cp(angle, k, j)
     
     # Swap qubits to reverse the order (optional, for standard QFT)
     for i in range(n // 2):
-        qc.swap(i, n - i - 1)
+        template.swap(i, n - i - 1)
+    return template
 
 
-def inverse_qft(qc: QuantumCircuit, n: int) -> None:
-    """Apply inverse Quantum Fourier Transform on the first n qubits."""
+@lru_cache(maxsize=32)
+def _inverse_qft_template(n: int) -> QuantumCircuit:
+    """Return the n-qubit inverse QFT as a sub-circuit, with its rotation angles computed once."""
+    template = QuantumCircuit(n)
     # Reverse the swaps
     for i in range(n // 2):
-        qc.swap(i, n - i - 1)
+        template.swap(i, n - i - 1)
     
     # Apply inverse of QFT operations in reverse order
     for j in range(n - 1, -1, -1):
         # Apply inverse controlled phase rotations
         for k in range(n - 1, j, -1):
             angle = -2 * math.pi / (2 ** (k - j + 1))
-            qc.cp(angle, k, j)
+            template.cp(angle, k, j)
         
         # Apply Hadamard
-        qc.h(j)
+        template.h(j)
+    return template
+
+
+def qft(qc: QuantumCircuit, n: int) -> None:
+    """Apply Quantum Fourier Transform on the first n qubits of circuit qc.
+    
+    The QFT maps computational basis states to Fourier basis:
+    |j⟩ → (1/√N) Σ_k e^(2πijk/N) |k⟩
+    """
+    qc.compose(_qft_template(n), qubits=range(n), inplace=True)
+
+
+def inverse_qft(qc: QuantumCircuit, n: int) -> None:
+    """Apply inverse Quantum Fourier Transform on the first n qubits."""
+    qc.compose(_inverse_qft_template(n), qubits=range(n), inplace=True)
+
+
+def build_qft_demo_circuit(n: int, initial_state: str) -> QuantumCircuit:
+    """Build the measured QFT → inverse QFT round-trip circuit."""
+    qc = QuantumCircuit(n, n)
+    
+    # Prepare initial state (bit i of the integer value is qubit i)
+    mask = int(initial_state, 2)
+    ones = [i for i in range(n) if (mask >> i) & 1]
+    if ones:
+        qc.x(ones)
+    
+    # Apply QFT
+    qft(qc, n)
+    
+    # Apply inverse QFT (should recover original state)
+    inverse_qft(qc, n)
+    
+    # Measure all qubits
+    qc.measure(range(n), range(n))
+    
+    return qc
+
+
+@lru_cache(maxsize=64)
+def _qft_demo_probabilities(n: int, initial_state: str) -> np.ndarray:
+    qc = build_qft_demo_circuit(n, initial_state).remove_final_measurements(inplace=False)
+    return Statevector(qc).probabilities()
 
 
 def run_qft_demo(n: int, initial_state: str, shots: int = 1024) -> Dict[str, int]:
@@ -55,7 +103,8 @@ def run_qft_demo(n: int, initial_state: str, shots: int = 1024) -> Dict[str, int
         shots: Number of measurement shots
     
     Returns:
-        Measurement counts
+        Measurement counts. The round trip is deterministic, so they are
+        computed from one statevector evaluation rather than sampled.
     """
     if n <= 0:
         raise ValueError("n must be >= 1")
@@ -64,62 +113,52 @@ def run_qft_demo(n: int, initial_state: str, shots: int = 1024) -> Dict[str, int
     if shots <= 0:
         raise ValueError("shots must be >= 1")
     
-    qc = QuantumCircuit(n, n)
-    
-    # Prepare initial state
-    for i, bit in enumerate(reversed(initial_state)):
-        if bit == "1":
-            qc.x(i)
-    
-    # Add barrier for visualization
-    qc.barrier()
-    
-    # Apply QFT
-    qft(qc, n)
-    
-    qc.barrier()
-    
-    # Apply inverse QFT (should recover original state)
-    inverse_qft(qc, n)
+    counts: Dict[str, int] = probabilities_to_counts(_qft_demo_probabilities(n, initial_state), shots)
+    return counts
+
+
+def qft_round_trip_fidelity(n: int, initial_state: str) -> float:
+    """Return |⟨initial|QFT† QFT|initial⟩|², the probability of recovering the initial state.
     
-    qc.barrier()
+    This checks the round trip with one statevector evaluation and no
+    shots at all; it should be 1 up to floating-point error.
+    """
+    if n <= 0:
+        raise ValueError("n must be >= 1")
+    if len(initial_state) != n or any(bit not in {"0", "1"} for bit in initial_state):
+        raise ValueError(f"initial_state must be a {n}-bit string")
     
-    # Measure all qubits
-    for i in range(n):
-        qc.measure(i, i)
-    
-    backend = Aer.get_backend("aer_simulator")
-    compiled = transpile(qc, backend)
-    job = backend.run(compiled, shots=shots)
-    result = job.result()
-    counts: Dict[str, int] = result.get_counts()
-    return counts
+    return float(_qft_demo_probabilities(n, initial_state)[int(initial_state, 2)])
 
 
-def run_qft_phase_demo(n: int, shots: int = 1024) -> Dict[str, int]:
-    """Demonstrate QFT on a superposition state showing phase encoding."""
+def build_qft_phase_circuit(n: int) -> QuantumCircuit:
+    """Build the measured circuit applying QFT to the uniform superposition."""
     qc = QuantumCircuit(n, n)
     
     # Create equal superposition
-    for i in range(n):
-        qc.h(i)
-    
-    qc.barrier()
+    qc.h(range(n))
     
     # Apply QFT
     qft(qc, n)
     
-    qc.barrier()
-    
     # Measure
-    for i in range(n):
-        qc.measure(i, i)
-    
-    backend = Aer.get_backend("aer_simulator")
-    compiled = transpile(qc, backend)
-    job = backend.run(compiled, shots=shots)
-    result = job.result()
-    counts: Dict[str, int] = result.get_counts()
+    qc.measure(range(n), range(n))
+    
+    return qc
+
+
+@lru_cache(maxsize=64)
+def _qft_phase_probabilities(n: int) -> np.ndarray:
+    qc = build_qft_phase_circuit(n).remove_final_measurements(inplace=False)
+    return Statevector(qc).probabilities()
+
+
+def run_qft_phase_demo(n: int, shots: int = 1024) -> Dict[str, int]:
+    """Demonstrate QFT on a superposition state showing phase encoding.
+    
+    Counts are the exact output probabilities scaled to `shots`.
+    """
+    counts: Dict[str, int] = probabilities_to_counts(_qft_phase_probabilities(n), shots)
     return counts
 
 
@@ -148,12 +187,14 @@ def print_phase_results(counts: Dict[str, int], n: int, shots: int) -> None:
     print(counts)
     
     print("\nTop measured states:")
-    for state, count in sorted(counts.items(), key=lambda x: x[1], reverse=True)[:10]:
+    for state, count in heapq.nlargest(10, counts.items(), key=itemgetter(1)):
         prob = count / shots
         print(f"  |{state}⟩: {count:4d} / {shots} ≈ {prob:.3f}")
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Quantum Fourier Transform (QFT) demo")
     parser.add_argument("--n", type=int, default=3, help="Number of qubits (>=1)")
     parser.add_argument(
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
-import argparse
+from functools import lru_cache
 from typing import Dict
 
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer
+from qiskit import QuantumCircuit
+
+from _sim import compile_for_backend, get_backend
 
 
 def majority_gate(qc: QuantumCircuit, a: int, b: int, c: int) -> None:
@@ -27,6 +28,38 @@ def unmajority_gate(qc: QuantumCircuit, a: int, b: int, c: int) -> None:
     qc.cx(a, b)
 
 
+@lru_cache(maxsize=32)
+def _adder_template(n: int) -> QuantumCircuit:
+    """Return the n-bit ripple-carry adder as a sub-circuit on 2n + 2 qubits.
+    
+    Qubits 0..n-1 hold a, n..2n-1 hold b, 2n is carry_in and 2n+1 carry_out.
+    The gate sequence only depends on n, so it is built once per width.
+    """
+    template = QuantumCircuit(2 * n + 2)
+    a_qubits = list(range(n))
+    b_qubits = list(range(n, 2 * n))
+    carry_in = 2 * n
+    carry_out = 2 * n + 1
+    
+    # Forward pass: propagate carries
+    for i in range(n):
+        if i == 0:
+            majority_gate(template, carry_in, b_qubits[i], a_qubits[i])
+        else:
+            majority_gate(template, a_qubits[i-1], b_qubits[i], a_qubits[i])
+    
+    # Final carry
+    template.cx(a_qubits[n-1], carry_out)
+    
+    # Backward pass: compute sum and uncompute carries
+    for i in range(n-1, -1, -1):
+        if i == 0:
+            unmajority_gate(template, carry_in, b_qubits[i], a_qubits[i])
+        else:
+            unmajority_gate(template, a_qubits[i-1], b_qubits[i], a_qubits[i])
+    return template
+
+
 def quantum_ripple_carry_adder(qc: QuantumCircuit, a_qubits: list, b_qubits: list, carry_in: int, carry_out: int) -> None:
     """Implement quantum ripple-carry adder.
     
@@ -41,23 +74,52 @@ def quantum_ripple_carry_adder(qc: QuantumCircuit, a_qubits: list, b_qubits: lis
         carry_out: Qubit index for final carry out
     """
     n = len(a_qubits)
+    qubits = list(a_qubits) + list(b_qubits) + [carry_in, carry_out]
+    qc.compose(_adder_template(n), qubits=qubits, inplace=True)
+
+
+# Circuit layout shared by the builders below:
+# - qubits 0..n-1: register a (input)
+# - qubits n..2n-1: register b (input, becomes sum output)
+# - qubit 2n: carry_in (initialized to 0)
+# - qubit 2n+1: carry_out
+
+
+def _input_circuit(a: int, b: int, n_bits: int) -> QuantumCircuit:
+    """Return the X gates that load a and b into their registers (LSB first)."""
+    qc = QuantumCircuit(2 * n_bits + 2, n_bits + 1)
     
-    # Forward pass: propagate carries
-    for i in range(n):
-        if i == 0:
-            majority_gate(qc, carry_in, b_qubits[i], a_qubits[i])
-        else:
-            majority_gate(qc, a_qubits[i-1], b_qubits[i], a_qubits[i])
+    # Encode a and b in their registers, flipping all set bits at once
+    ones = [i for i in range(n_bits) if (a >> i) & 1]
+    ones += [n_bits + i for i in range(n_bits) if (b >> i) & 1]
+    if ones:
+        qc.x(ones)
+    return qc
+
+
+def build_adder_circuit(n_bits: int) -> QuantumCircuit:
+    """Build the input-independent part: the adder and the sum/carry-out measurements."""
+    total_qubits = 2 * n_bits + 2
+    qc = QuantumCircuit(total_qubits, n_bits + 1)
     
-    # Final carry
-    qc.cx(a_qubits[n-1], carry_out)
+    a_qubits = list(range(n_bits))
+    b_qubits = list(range(n_bits, 2 * n_bits))
+    carry_in = 2 * n_bits
+    carry_out = 2 * n_bits + 1
     
-    # Backward pass: compute sum and uncompute carries
-    for i in range(n-1, -1, -1):
-        if i == 0:
-            unmajority_gate(qc, carry_in, b_qubits[i], a_qubits[i])
-        else:
-            unmajority_gate(qc, a_qubits[i-1], b_qubits[i], a_qubits[i])
+    # Perform quantum addition
+    quantum_ripple_carry_adder(qc, a_qubits, b_qubits, carry_in, carry_out)
+    
+    # Measure result (b_qubits + carry_out)
+    qc.measure(b_qubits + [carry_out], range(n_bits + 1))
+    
+    return qc
+
+
+@lru_cache(maxsize=32)
+def _compiled_adder_circuit(n_bits: int) -> QuantumCircuit:
+    # The adder only depends on n_bits, so one compiled circuit serves every (a, b)
+    return compile_for_backend(build_adder_circuit(n_bits))
 
 
 def run_quantum_addition(a: int, b: int, n_bits: int = 4, shots: int = 1024) -> Dict[str, int]:
@@ -81,47 +143,11 @@ def run_quantum_addition(a: int, b: int, n_bits: int = 4, shots: int = 1024) ->
     if shots <= 0:
         raise ValueError("shots must be >= 1")
     
-    # Circuit layout:
-    # - qubits 0..n-1: register a (input)
-    # - qubits n..2n-1: register b (input, becomes sum output)
-    # - qubit 2n: carry_in (initialized to 0)
-    # - qubit 2n+1: carry_out
-    total_qubits = 2 * n_bits + 2
-    qc = QuantumCircuit(total_qubits, n_bits + 1)
+    # Only the input X gates change between calls; prepend them to the compiled adder
+    qc = _input_circuit(a, b, n_bits).compose(_compiled_adder_circuit(n_bits))
     
-    a_qubits = list(range(n_bits))
-    b_qubits = list(range(n_bits, 2 * n_bits))
-    carry_in = 2 * n_bits
-    carry_out = 2 * n_bits + 1
-    
-    # Prepare input states
-    # Encode a in register a (LSB first)
-    a_bits = format(a, f'0{n_bits}b')[::-1]  # Reverse for LSB first
-    for i, bit in enumerate(a_bits):
-        if bit == '1':
-            qc.x(a_qubits[i])
-    
-    # Encode b in register b (LSB first)
-    b_bits = format(b, f'0{n_bits}b')[::-1]  # Reverse for LSB first
-    for i, bit in enumerate(b_bits):
-        if bit == '1':
-            qc.x(b_qubits[i])
-    
-    qc.barrier()
-    
-    # Perform quantum addition
-    quantum_ripple_carry_adder(qc, a_qubits, b_qubits, carry_in, carry_out)
-    
-    qc.barrier()
-    
-    # Measure result (b_qubits + carry_out)
-    for i in range(n_bits):
-        qc.measure(b_qubits[i], i)
-    qc.measure(carry_out, n_bits)
-    
-    backend = Aer.get_backend("aer_simulator")
-    compiled = transpile(qc, backend)
-    job = backend.run(compiled, shots=shots)
+    backend = get_backend()
+    job = backend.run(qc, shots=shots)
     result = job.result()
     counts: Dict[str, int] = result.get_counts()
     return counts
@@ -154,6 +180,8 @@ def print_addition_results(counts: Dict[str, int], a: int, b: int, n_bits: int,
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Quantum Addition using Ripple-Carry Adder")
     parser.add_argument("--a", type=int, default=3, help="First integer to add")
     parser.add_argument("--b", type=int, default=5, help="Second integer to add")
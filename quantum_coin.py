@@ -1,10 +1,27 @@
 from __future__ import annotations
 
-import argparse
+from functools import lru_cache
 from typing import Dict
 
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer
+from qiskit import QuantumCircuit
+
+from _sim import compile_for_backend, get_backend
+
+
+def build_coin_circuit(num_qubits: int) -> QuantumCircuit:
+    """Build the circuit putting `num_qubits` qubits in equal superposition and measuring them."""
+    qc = QuantumCircuit(num_qubits)
+
+    # Put all qubits into equal superposition
+    qc.h(range(num_qubits))
+
+    qc.measure_all()
+    return qc
+
+
+@lru_cache(maxsize=64)
+def _compiled_coin_circuit(num_qubits: int) -> QuantumCircuit:
+    return compile_for_backend(build_coin_circuit(num_qubits))
 
 
 def run_quantum_coin(num_qubits: int = 1, shots: int = 1024) -> Dict[str, int]:
@@ -19,17 +36,8 @@ def run_quantum_coin(num_qubits: int = 1, shots: int = 1024) -> Dict[str, int]:
     if shots <= 0:
         raise ValueError("shots must be >= 1")
 
-    qc = QuantumCircuit(num_qubits)
-
-    # Put all qubits into equal superposition
-    for qubit in range(num_qubits):
-        qc.h(qubit)
-
-    qc.measure_all()
-
-    backend = Aer.get_backend("aer_simulator")
-    compiled = transpile(qc, backend)
-    job = backend.run(compiled, shots=shots)
+    backend = get_backend()
+    job = backend.run(_compiled_coin_circuit(num_qubits), shots=shots)
     result = job.result()
     counts: Dict[str, int] = result.get_counts()
     return counts
@@ -45,6 +53,8 @@ def print_counts_and_probabilities(counts: Dict[str, int], shots: int) -> None:
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Quantum coin/dice demo using Qiskit")
     parser.add_argument("--qubits", type=int, default=1, help="Number of qubits (>=1)")
     parser.add_argument("--shots", type=int, default=1024, help="Number of shots (>=1)")
@@ -1,20 +1,7 @@
 from __future__ import annotations
 
-import argparse
-
-from hello_quantum import run_hello
-from quantum_coin import run_quantum_coin, print_counts_and_probabilities as print_coin_counts
-from baby_grover import run_baby_grover_2_qubits, print_counts_and_probabilities as print_grover_counts
-from bell_state_lab import (
-    run_bell_state,
-    run_product_superposition,
-    print_counts_and_probabilities as print_bell_counts,
-)
-from circuit_playground import interactive_playground, demo_playground
-from teleportation_demo import run_teleportation, print_results as print_teleportation_results
-from deutsch_jozsa import run_deutsch_jozsa, print_dj_results
-from bernstein_vazirani import run_bernstein_vazirani, print_bv_results
-from vqe_demo import run_vqe_demo, print_vqe_result
+# Each demo module is imported inside its --mode branch of main(), so a
+# single-mode run only loads the Qiskit/Aer (or Qiskit Nature) stack it uses.
 
 
 MODES = [
@@ -31,6 +18,8 @@ MODES = [
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Unified CLI for the Quantum Coding Playground examples",
     )
@@ -93,6 +82,8 @@ def main() -> None:
         raise SystemExit("--shots must be >= 1")
 
     if args.mode == "hello":
+        from hello_quantum import run_hello
+
         counts = run_hello(shots=args.shots)
         print("\n[hello_quantum] Single-qubit Hadamard demo")
         print("Measurement results (counts per state):")
@@ -101,6 +92,8 @@ def main() -> None:
     elif args.mode == "coin":
         if args.qubits <= 0:
             raise SystemExit("--qubits must be >= 1 for coin mode")
+        from quantum_coin import run_quantum_coin, print_counts_and_probabilities as print_coin_counts
+
         counts = run_quantum_coin(num_qubits=args.qubits, shots=args.shots)
         print(f"\n[quantum_coin] Quantum coin/dice with {args.qubits} qubit(s)")
         print_coin_counts(counts, args.shots)
@@ -108,44 +101,67 @@ def main() -> None:
     elif args.mode == "grover":
         if len(args.target) != 2 or any(bit not in {"0", "1"} for bit in args.target):
             raise SystemExit("--target must be one of: 00, 01, 10, 11")
+        from baby_grover import run_baby_grover_2_qubits, print_counts_and_probabilities as print_grover_counts
+
         counts = run_baby_grover_2_qubits(target=args.target, shots=args.shots)
         print(f"\n[baby_grover] 2-qubit Grover for target: {args.target}")
         print_grover_counts(counts, args.shots, highlight=args.target)
 
     elif args.mode == "bell":
-        if args.bell_mode in ("bell", "both"):
+        from bell_state_lab import (
+            run_bell_state,
+            run_product_superposition,
+            run_bell_and_product,
+            print_counts_and_probabilities as print_bell_counts,
+        )
+
+        if args.bell_mode == "both":
+            bell_counts, product_counts = run_bell_and_product(shots=args.shots)
+            print_bell_counts("Bell state (entangled)", bell_counts, args.shots)
+            print_bell_counts("Product H⊗H state (not entangled)", product_counts, args.shots)
+        elif args.bell_mode == "bell":
             bell_counts = run_bell_state(shots=args.shots)
             print_bell_counts("Bell state (entangled)", bell_counts, args.shots)
-        if args.bell_mode in ("product", "both"):
+        else:
             product_counts = run_product_superposition(shots=args.shots)
             print_bell_counts("Product H⊗H state (not entangled)", product_counts, args.shots)
 
     elif args.mode == "playground":
         if args.qubits <= 0:
             raise SystemExit("--qubits must be >= 1 for playground mode")
+        from circuit_playground import interactive_playground, demo_playground
+
         if args.playground_mode == "interactive":
             interactive_playground(args.qubits, args.shots)
         else:
             demo_playground(args.qubits, args.shots)
 
     elif args.mode == "teleport":
+        from teleportation_demo import run_teleportation, print_results as print_teleportation_results
+
         counts = run_teleportation(args.state, shots=args.shots)
         print_teleportation_results(args.state, counts, args.shots)
 
     elif args.mode == "deutsch_jozsa":
         if args.dj_n <= 0:
             raise SystemExit("--dj-n must be >= 1 for Deutsch–Jozsa mode")
+        from deutsch_jozsa import run_deutsch_jozsa, print_dj_results
+
         counts = run_deutsch_jozsa(n=args.dj_n, oracle_type=args.dj_oracle, shots=args.shots)
         print_dj_results(counts, args.dj_n, args.dj_oracle, args.shots)
 
     elif args.mode == "bernstein_vazirani":
         if not args.bv_secret or any(bit not in {"0", "1"} for bit in args.bv_secret):
             raise SystemExit("--bv-secret must be a non-empty bitstring of 0s and 1s")
+        from bernstein_vazirani import run_bernstein_vazirani, print_bv_results
+
         counts = run_bernstein_vazirani(secret=args.bv_secret, shots=args.shots)
         print_bv_results(counts, args.bv_secret, args.shots)
 
     elif args.mode == "vqe":
-        energy, evals = run_vqe_demo(shots=args.shots)
+        from vqe_demo import run_vqe_demo, print_vqe_result
+
+        energy, evals = run_vqe_demo()
         print_vqe_result(energy, evals)
 
 
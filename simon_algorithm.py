@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-import argparse
+from functools import lru_cache
 from typing import Dict, List
 import numpy as np
 
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import Aer
+from qiskit import QuantumCircuit
+
+from _kernels import gf2_row_reduce, parities
+from _sim import compile_for_backend, get_backend
 
 
 def apply_simon_oracle(qc: QuantumCircuit, secret: str) -> None:
@@ -29,69 +31,92 @@ def apply_simon_oracle(qc: QuantumCircuit, secret: str) -> None:
             qc.cx(i, n + i)
 
 
-def run_simon_algorithm(secret: str, shots: int = 1024) -> Dict[str, int]:
-    """Run Simon's algorithm for a given secret bitstring.
-    
-    Returns counts over the measured input register.
-    The algorithm finds orthogonal vectors to the secret string s.
-    """
-    if not secret or any(bit not in {"0", "1"} for bit in secret):
-        raise ValueError("secret must be a non-empty bitstring of 0s and 1s")
-    if shots <= 0:
-        raise ValueError("shots must be >= 1")
-    
+def build_simon_circuit(secret: str) -> QuantumCircuit:
+    """Build Simon's circuit measuring the input register."""
     n = len(secret)
     qc = QuantumCircuit(2 * n, n)
     
     # Apply Hadamard to input register
-    for i in range(n):
-        qc.h(i)
+    qc.h(range(n))
     
     # Apply Simon's oracle
     apply_simon_oracle(qc, secret)
     
     # Apply Hadamard to input register again
-    for i in range(n):
-        qc.h(i)
+    qc.h(range(n))
     
     # Measure input register
-    for i in range(n):
-        qc.measure(i, i)
+    qc.measure(range(n), range(n))
+    
+    return qc
+
+
+@lru_cache(maxsize=64)
+def _compiled_simon_circuit(secret: str) -> QuantumCircuit:
+    return compile_for_backend(build_simon_circuit(secret))
+
+
+def run_simon_algorithm(secret: str, shots: int = 1024) -> Dict[str, int]:
+    """Run Simon's algorithm for a given secret bitstring.
     
-    backend = Aer.get_backend("aer_simulator")
-    compiled = transpile(qc, backend)
-    job = backend.run(compiled, shots=shots)
+    Returns counts over the measured input register.
+    The algorithm finds orthogonal vectors to the secret string s.
+    """
+    if not secret or any(bit not in {"0", "1"} for bit in secret):
+        raise ValueError("secret must be a non-empty bitstring of 0s and 1s")
+    if shots <= 0:
+        raise ValueError("shots must be >= 1")
+    
+    backend = get_backend()
+    job = backend.run(_compiled_simon_circuit(secret), shots=shots)
     result = job.result()
     counts: Dict[str, int] = result.get_counts()
     return counts
 
 
+def pack_bitstrings(bitstrings: List[str], n: int) -> np.ndarray:
+    """Pack n-bit strings into rows of uint64 words, bit i of the value in word i // 64."""
+    num_words = (n + 63) // 64
+    rows = np.zeros((len(bitstrings), num_words), dtype=np.uint64)
+    for r, bitstring in enumerate(bitstrings):
+        value = int(bitstring, 2)
+        for w in range(num_words):
+            rows[r, w] = (value >> (64 * w)) & 0xFFFFFFFFFFFFFFFF
+    return rows
+
+
 def solve_secret_from_measurements(measurements: List[str], n: int) -> str:
     """Solve for the secret string using Gaussian elimination.
     
     Each measurement y satisfies: y · s = 0 (mod 2)
     We need n-1 linearly independent equations to solve for s.
+    
+    The equations are packed 64 bits per uint64 word and reduced by
+    Gauss-Jordan elimination over GF(2) (`gf2_row_reduce`, compiled with
+    Numba when it is installed). The secret is the single non-zero vector
+    in the null space of the reduced system.
     """
-    # Convert measurement strings to binary vectors
-    vectors = []
-    for m in measurements:
-        if m != "0" * n:  # Skip the all-zeros vector
-            vec = [int(bit) for bit in reversed(m)]
-            vectors.append(vec)
+    # Skip the all-zeros vector, it carries no information
+    vectors = [m for m in measurements if "1" in m]
     
     if len(vectors) < n - 1:
         return "Not enough measurements"
     
-    # Gaussian elimination over GF(2)
-    matrix = np.array(vectors[:n-1], dtype=int)
-    
-    # Try to solve for secret
-    # This is a simplified approach - in practice, you'd use proper linear algebra over GF(2)
-    secret_bits = []
-    for i in range(n):
-        secret_bits.append("?")
-    
-    return f"System of equations collected (needs {n-1} independent vectors)"
+    rows = pack_bitstrings(vectors, n)
+    pivots = gf2_row_reduce(rows, n)
+    rank = int((pivots >= 0).sum())
+    
+    if rank != n - 1:
+        return f"Not enough independent measurements (rank {rank}, needs {n - 1})"
+    
+    # Exactly one free column: set it to 1 and read each pivot bit off its row
+    free_col = int(np.flatnonzero(pivots < 0)[0])
+    word, shift = divmod(free_col, 64)
+    secret = 1 << free_col
+    for col in np.flatnonzero(pivots >= 0):
+        if (int(rows[pivots[col], word]) >> shift) & 1:
+            secret |= 1 << int(col)
+    return format(secret, f"0{n}b")
 
 
 def print_simon_results(counts: Dict[str, int], secret: str, shots: int) -> None:
@@ -103,20 +128,23 @@ def print_simon_results(counts: Dict[str, int], secret: str, shots: int) -> None
     print(f"  Expected: All measured strings y should satisfy y · s = 0 (mod 2)")
     print(f"  where s = {secret}")
     
-    # Verify orthogonality
-    n = len(secret)
-    secret_bits = [int(bit) for bit in reversed(secret)]
+    # Verify orthogonality: y · s (mod 2) is the parity of the shared set bits,
+    # computed for every measured state in one kernel call (the 2n-qubit
+    # circuit keeps n far below the 64 bits a uint64 holds)
+    ordered = sorted(counts.items(), key=lambda x: x[1], reverse=True)
+    values = np.array([int(state, 2) for state, _ in ordered], dtype=np.uint64)
+    dot_products = parities(values, np.uint64(int(secret, 2)))
     
     print("\nVerifying orthogonality:")
-    for state, count in sorted(counts.items(), key=lambda x: x[1], reverse=True):
-        y_bits = [int(bit) for bit in reversed(state)]
-        dot_product = sum(y_bits[i] * secret_bits[i] for i in range(n)) % 2
+    for (state, count), dot_product in zip(ordered, dot_products):
         status = "✓" if dot_product == 0 else "✗"
         prob = count / shots
         print(f"  {state}: {count:4d} ({prob:.3f}) - y·s = {dot_product} {status}")
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Simon's algorithm demo")
     parser.add_argument("--secret", type=str, default="110", help="Secret bitstring s (e.g. 110)")
     parser.add_argument("--shots", type=int, default=1024, help="Number of shots (>=1)")
@@ -1,22 +1,35 @@
 from __future__ import annotations
 
-import argparse
-from typing import Dict, List
-
-from qiskit import QuantumCircuit, transpile
+from qiskit import QuantumCircuit
 from qiskit.quantum_info import Statevector
-from qiskit_aer import AerSimulator
 import numpy as np
 
+from _sim import compile_for_backend, get_backend
+
+
+# Small circuits skip the fixed cost of an Aer job; larger ones are faster in
+# Aer's compiled kernels.
+DIRECT_STATEVECTOR_MAX_QUBITS = 12
+
 
 def run_circuit_with_statevector(qc: QuantumCircuit) -> Statevector:
-    """Run a circuit and return the final statevector (before measurement)."""
+    """Run a circuit and return the final statevector (before measurement).
+    
+    A small circuit without measurements is evaluated directly, with no
+    copy. Otherwise the measurements are stripped from a copy and the state
+    is simulated in single precision by the shared Aer backend with
+    `save_statevector`; the demo's 4-decimal output does not need more.
+    """
+    has_measurements = any(inst.operation.name == "measure" for inst in qc.data)
+    if not has_measurements and qc.num_qubits <= DIRECT_STATEVECTOR_MAX_QUBITS:
+        return Statevector(qc)
+    
     # Remove any measurements to get pure statevector
-    qc_copy = qc.copy()
-    qc_copy.remove_final_measurements(inplace=False)
+    qc_copy = qc.remove_final_measurements(inplace=False)
+    qc_copy.save_statevector()
     
-    # Use statevector simulator
-    sv = Statevector(qc_copy)
+    result = get_backend().run(compile_for_backend(qc_copy)).result()
+    sv = Statevector(result.data(0)["statevector"])
     return sv
 
 
@@ -30,22 +43,18 @@ def print_statevector_analysis(sv: Statevector, label: str = "Circuit") -> None:
     
     print("\nAmplitudes (complex):")
     data = sv.data
-    for i, amplitude in enumerate(data):
-        bitstring = format(i, f"0{n_qubits}b")
-        real = amplitude.real
-        imag = amplitude.imag
-        prob = abs(amplitude) ** 2
-        
-        # Only print non-negligible amplitudes
-        if prob > 1e-6:
-            print(f"  |{bitstring}⟩: ({real:+.4f} {imag:+.4f}j)  probability: {prob:.4f}")
+    probs = data.real ** 2 + data.imag ** 2
+    
+    # Only print non-negligible amplitudes; sparse states skip almost every index
+    support = np.flatnonzero(probs > 1e-6)
+    labels = [format(i, f"0{n_qubits}b") for i in support]
+    for i, bitstring in zip(support, labels):
+        amplitude = data[i]
+        print(f"  |{bitstring}⟩: ({amplitude.real:+.4f} {amplitude.imag:+.4f}j)  probability: {probs[i]:.4f}")
     
     print("\nProbabilities (measurement outcomes):")
-    probs = sv.probabilities()
-    for i, prob in enumerate(probs):
-        if prob > 1e-6:
-            bitstring = format(i, f"0{n_qubits}b")
-            print(f"  |{bitstring}⟩: {prob:.4f}")
+    for i, bitstring in zip(support, labels):
+        print(f"  |{bitstring}⟩: {probs[i]:.4f}")
 
 
 def demo_bell_state_statevector() -> None:
@@ -89,6 +98,8 @@ def demo_grover_statevector() -> None:
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Statevector simulator demo")
     parser.add_argument(
         "--demo",
@@ -0,0 +1,31 @@
+"""
+Shared fixtures for the quantum demo tests.
+
+Tests that only inspect the measurement statistics of a demo circuit read
+them from one batched simulator job instead of running a job each. At least
+one test per demo still goes through its `run_*` function.
+"""
+
+from typing import Dict
+
+import pytest
+
+from _sim import compile_for_backend, run_batch
+from deutsch_jozsa import build_deutsch_jozsa_circuit
+from hello_quantum import build_hello_circuit
+
+
+# Sized for the hello 50/50 test: a +/-0.1 band needs ~725 shots by
+# Hoeffding's two-sided bound. The Deutsch–Jozsa circuit is deterministic.
+BATCH_SHOTS = 1000
+
+
+@pytest.fixture(scope="session")
+def batched_counts() -> Dict[str, Dict[str, int]]:
+    """Counts for the circuits sampled by statistics-only tests, from a single `run_batch` call."""
+    circuits = {
+        "hello": build_hello_circuit(),
+        "dj_balanced_parity": build_deutsch_jozsa_circuit(2, "balanced_parity"),
+    }
+    compiled = [compile_for_backend(qc) for qc in circuits.values()]
+    return dict(zip(circuits, run_batch(compiled, shots=BATCH_SHOTS)))
@@ -2,35 +2,63 @@
 Unit tests for quantum demos with probabilistic validation.
 
 Since quantum measurements are probabilistic, tests use statistical thresholds
-rather than exact value matching.
+rather than exact value matching. The hello 50/50, quantum coin outcome and
+baby Grover tests use the fewest shots that keep a false failure below 1e-6;
+for a threshold `margin` below the true probability Hoeffding's bound needs
+shots >= ln(1e6) / (2 * margin**2). Tests taking the `batched_counts` fixture
+(see conftest.py) share one shot count, sized for the hello 50/50 test.
+
+Every demo runs on the backend returned by `_sim.get_backend()`, which is
+created once per process and so shared by the whole test session.
 """
 
+import numpy as np
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+from qiskit.circuit.library import UnitaryGate
+
 from hello_quantum import run_hello
 from quantum_coin import run_quantum_coin
 from baby_grover import run_baby_grover_2_qubits
-from deutsch_jozsa import run_deutsch_jozsa, classify_deutsch_jozsa
+from bell_state_lab import run_bell_state
+from deutsch_jozsa import run_deutsch_jozsa, run_deutsch_jozsa_batch, classify_deutsch_jozsa
 from bernstein_vazirani import run_bernstein_vazirani
+from circuit_playground import run_circuit
+from phase_estimation import binary_to_phase, binary_strings_to_phases
+from qft_demo import qft_round_trip_fidelity, run_qft_demo
+from simon_algorithm import solve_secret_from_measurements
+
+
+def most_probable(counts):
+    """Return the most frequent outcome in a counts dict ("" if it is empty)."""
+    return max(counts, key=counts.get, default="")
+
+
+def counts_to_array(counts, n):
+    """Return counts as a dense int64 histogram indexed by the integer value of each n-bit outcome."""
+    indices = [int(outcome, 2) for outcome in counts]
+    return np.bincount(indices, weights=list(counts.values()), minlength=2 ** n).astype(np.int64)
+
+
+def total_counts(counts):
+    """Return the number of shots recorded in a counts dict."""
+    return int(np.fromiter(counts.values(), dtype=np.int64, count=len(counts)).sum())
 
 
 def test_hello_quantum_sum():
     """Test that hello_quantum returns counts that sum to shots."""
     shots = 100
     counts = run_hello(shots=shots)
-    total = sum(counts.values())
+    total = total_counts(counts)
     assert total == shots, f"Expected total {shots}, got {total}"
 
 
-def test_hello_quantum_distribution():
+def test_hello_quantum_distribution(batched_counts):
     """Test that hello_quantum produces roughly 50/50 distribution."""
-    shots = 1000
-    counts = run_hello(shots=shots)
+    counts = batched_counts["hello"]
+    shots = total_counts(counts)
     
     # Allow 40-60% for each outcome (generous threshold for statistical fluctuation)
-    count_0 = counts.get("0", 0)
-    count_1 = counts.get("1", 0)
-    
-    prob_0 = count_0 / shots
-    prob_1 = count_1 / shots
+    prob_0, prob_1 = counts_to_array(counts, 1) / shots
     
     assert 0.4 <= prob_0 <= 0.6, f"Probability of '0' is {prob_0:.3f}, expected ~0.5"
     assert 0.4 <= prob_1 <= 0.6, f"Probability of '1' is {prob_1:.3f}, expected ~0.5"
@@ -40,13 +68,14 @@ def test_quantum_coin_sum():
     """Test that quantum_coin returns counts summing to shots."""
     shots = 100
     counts = run_quantum_coin(num_qubits=2, shots=shots)
-    total = sum(counts.values())
+    total = total_counts(counts)
     assert total == shots, f"Expected total {shots}, got {total}"
 
 
 def test_quantum_coin_outcomes():
     """Test that quantum_coin produces all expected 2-qubit outcomes."""
-    shots = 500
+    # P(some outcome missing) <= 4 * (3/4)**shots < 1e-6 from 53 shots
+    shots = 100
     counts = run_quantum_coin(num_qubits=2, shots=shots)
     
     # All 4 outcomes should appear with reasonable probability
@@ -59,18 +88,37 @@ def test_quantum_coin_outcomes():
 
 def test_baby_grover_target_dominance():
     """Test that Grover's algorithm significantly boosts target state probability."""
-    shots = 1000
+    # True probability is 1: a margin of 0.2 needs ~173 shots
+    shots = 200
     target = "11"
     counts = run_baby_grover_2_qubits(target=target, shots=shots)
     
-    target_count = counts.get(target, 0)
-    target_prob = target_count / shots
+    target_prob = counts_to_array(counts, 2)[int(target, 2)] / shots
     
     # Target should dominate: expect > 80% probability
     assert target_prob > 0.8, \
         f"Target '{target}' probability is {target_prob:.3f}, expected > 0.8"
 
 
+def test_bell_state_exact():
+    """Test that exact mode returns the ideal Bell distribution scaled to shots."""
+    shots = 1000
+    counts = run_bell_state(shots=shots, exact=True)
+    
+    assert counts == {"00": 500, "11": 500}, f"Unexpected exact counts {counts}"
+
+
+def test_qft_round_trip():
+    """Test that QFT followed by inverse QFT returns the initial state every time."""
+    shots = 500
+    counts = run_qft_demo(n=4, initial_state="1011", shots=shots)
+    
+    assert counts == {"1011": shots}, f"Unexpected round-trip counts {counts}"
+    
+    fidelity = qft_round_trip_fidelity(4, "1011")
+    assert abs(fidelity - 1) < 1e-9, f"Round-trip fidelity is {fidelity}, expected 1"
+
+
 def test_deutsch_jozsa_constant():
     """Test that Deutsch–Jozsa correctly identifies constant oracles."""
     shots = 500
@@ -81,16 +129,26 @@ def test_deutsch_jozsa_constant():
         f"Expected 'constant', got '{classification}'"
 
 
-def test_deutsch_jozsa_balanced():
+def test_deutsch_jozsa_balanced(batched_counts):
     """Test that Deutsch–Jozsa correctly identifies balanced oracles."""
-    shots = 500
-    counts = run_deutsch_jozsa(n=2, oracle_type="balanced_parity", shots=shots)
+    counts = batched_counts["dj_balanced_parity"]
     classification = classify_deutsch_jozsa(counts, n=2)
     
     assert classification == "balanced", \
         f"Expected 'balanced', got '{classification}'"
 
 
+def test_deutsch_jozsa_batch():
+    """Test that a batched Deutsch–Jozsa run classifies every oracle correctly."""
+    shots = 500
+    oracle_types = ["constant_zero", "constant_one", "balanced_first", "balanced_parity"]
+    all_counts = run_deutsch_jozsa_batch(n=2, oracle_types=oracle_types, shots=shots)
+    classifications = [classify_deutsch_jozsa(counts, n=2) for counts in all_counts]
+    
+    assert classifications == ["constant", "constant", "balanced", "balanced"], \
+        f"Unexpected classifications {classifications}"
+
+
 def test_bernstein_vazirani_recovery():
     """Test that Bernstein–Vazirani recovers the secret bitstring."""
     shots = 500
@@ -98,10 +156,7 @@ def test_bernstein_vazirani_recovery():
     counts = run_bernstein_vazirani(secret=secret, shots=shots)
     
     # Most frequent outcome should be the secret
-    if counts:
-        recovered = max(counts.items(), key=lambda item: item[1])[0]
-    else:
-        recovered = ""
+    recovered = most_probable(counts)
     
     assert recovered == secret, \
         f"Expected to recover '{secret}', got '{recovered}'"
@@ -109,13 +164,73 @@ def test_bernstein_vazirani_recovery():
 
 def test_bernstein_vazirani_high_confidence():
     """Test that BV algorithm has high confidence in the recovered secret."""
-    shots = 1000
+    # The noiseless circuit returns the secret on every shot
+    shots = 200
     secret = "101"
     counts = run_bernstein_vazirani(secret=secret, shots=shots)
     
-    secret_count = counts.get(secret, 0)
-    secret_prob = secret_count / shots
+    assert most_probable(counts) == secret
+    
+    secret_prob = counts_to_array(counts, 3)[int(secret, 2)] / shots
     
     # Expect > 90% confidence in the secret
     assert secret_prob > 0.9, \
         f"Secret '{secret}' probability is {secret_prob:.3f}, expected > 0.9"
+
+
+def test_binary_to_phase_batch_matches_scalar():
+    """Test that the vectorized phase conversion agrees with binary_to_phase."""
+    states = ["000", "011", "100", "111"]
+    phases = binary_strings_to_phases(states, 3)
+    
+    for state, phase in zip(states, phases):
+        assert phase == binary_to_phase(state), \
+            f"State '{state}': batch gave {phase}, scalar gave {binary_to_phase(state)}"
+    assert binary_to_phase("011") == 0.375
+
+
+def test_simon_solver_recovers_secret():
+    """Test that GF(2) elimination recovers s from vectors orthogonal to it."""
+    # All 3-bit y with y · 101 = 0 (mod 2)
+    measurements = ["000", "010", "101", "111"]
+    
+    assert solve_secret_from_measurements(measurements, 3) == "101"
+
+
+def test_circuit_playground_runs_unitary_gate():
+    """Test that run_circuit handles gates with array parameters (not cacheable)."""
+    shots = 100
+    qc = QuantumCircuit(1)
+    qc.append(UnitaryGate(np.array([[0, 1], [1, 0]])), [0])
+    
+    for _ in range(2):
+        counts = run_circuit(qc, shots=shots)
+        assert counts == {"1": shots}, f"Unexpected counts {counts}"
+
+
+def test_circuit_playground_distinguishes_register_layouts():
+    """Test that circuits differing only in classical registers are not confused."""
+    shots = 100
+    one_register = QuantumCircuit(QuantumRegister(2), ClassicalRegister(2))
+    two_registers = QuantumCircuit(QuantumRegister(2), ClassicalRegister(1), ClassicalRegister(1))
+    for qc in (one_register, two_registers):
+        qc.x(0)
+        qc.measure([0, 1], [0, 1])
+    
+    assert run_circuit(one_register, shots=shots) == {"01": shots}
+    assert run_circuit(two_registers, shots=shots) == {"0 1": shots}
+
+
+def test_circuit_playground_distinguishes_custom_gates():
+    """Test that custom gates sharing a name but not a definition are not confused."""
+    shots = 50
+    flip = QuantumCircuit(1, name="oracle")
+    flip.x(0)
+    identity = QuantumCircuit(1, name="oracle")
+    results = []
+    for oracle in (flip, identity):
+        qc = QuantumCircuit(1)
+        qc.append(oracle.to_gate(), [0])
+        results.append(run_circuit(qc, shots=shots))
+    
+    assert results == [{"1": shots}, {"0": shots}], f"Unexpected counts {results}"
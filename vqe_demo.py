@@ -1,32 +1,63 @@
 from __future__ import annotations
 
-import argparse
+from functools import lru_cache
 from typing import Tuple
 
-import numpy as np
-from qiskit import QuantumCircuit, transpile
+from qiskit import QuantumCircuit
 from qiskit_algorithms.minimum_eigensolvers import VQE
 from qiskit_algorithms.optimizers import COBYLA
 from qiskit_aer.primitives import EstimatorV2 as Estimator
 from qiskit.circuit.library import TwoLocal
-from qiskit_nature.second_q.drivers import PySCFDriver
-from qiskit_nature.second_q.mappers import JordanWignerMapper
+from qiskit.primitives import StatevectorEstimator
 from qiskit.quantum_info import SparsePauliOp
-from qiskit_aer.primitives import SamplerV2 as Sampler
+import numpy as np
 
+from _sim import gpu_available
 
-def get_h2_hamiltonian() -> SparsePauliOp:
-    """Return a simplified PauliSumOp representation of the H2 molecule Hamiltonian.
 
-    This is a toy version for demonstration purposes.
-    """
+# Seed for the VQE starting parameters, so repeated runs are reproducible
+INITIAL_POINT_SEED = 42
+
+# Two-qubit H2 Hamiltonian at 0.735 Å (STO-3G, parity mapping with the two
+# symmetry qubits removed); same electronic spectrum as the PySCF operator
+TOY_H2_HAMILTONIAN = SparsePauliOp.from_list([
+    ("II", -1.052373245772859),
+    ("IZ", 0.39793742484318045),
+    ("ZI", -0.39793742484318045),
+    ("ZZ", -0.01128010425623538),
+    ("XX", 0.18093119978423156),
+])
+
+
+@lru_cache(maxsize=4)
+def _qubit_hamiltonian(atom: str, basis: str) -> SparsePauliOp:
+    """Run PySCF for `atom`/`basis` and map the result to qubits, once per process."""
+    # qiskit-nature and PySCF are slow to import, so only the pyscf source loads them
+    from qiskit_nature.second_q.drivers import PySCFDriver
+    from qiskit_nature.second_q.mappers import JordanWignerMapper
+    
     # Use PySCF to generate the Hamiltonian
-    driver = PySCFDriver(atom='H 0 0 0; H 0 0 0.735', basis='sto3g')
+    driver = PySCFDriver(atom=atom, basis=basis)
     problem = driver.run()
     
     # Map to qubit operator
     mapper = JordanWignerMapper()
-    qubit_op = mapper.map(problem.hamiltonian.second_q_op())
+    return mapper.map(problem.hamiltonian.second_q_op())
+
+
+def get_h2_hamiltonian(source: str = "pyscf") -> SparsePauliOp:
+    """Return a SparsePauliOp representation of the H2 molecule Hamiltonian.
+
+    With source="pyscf" the 4-qubit operator is computed by PySCF; the SCF
+    calculation behind it runs only on the first call. source="toy" returns
+    the precomputed 2-qubit `TOY_H2_HAMILTONIAN` without importing PySCF.
+    """
+    if source == "toy":
+        qubit_op = TOY_H2_HAMILTONIAN
+    elif source == "pyscf":
+        qubit_op = _qubit_hamiltonian('H 0 0 0; H 0 0 0.735', 'sto3g')
+    else:
+        raise ValueError("source must be 'toy' or 'pyscf'")
     
     print("Hamiltonian:")
     print(qubit_op)
@@ -34,40 +65,81 @@ def get_h2_hamiltonian() -> SparsePauliOp:
     return qubit_op
 
 
+@lru_cache(maxsize=8)
 def create_ansatz(num_qubits: int, reps: int = 1) -> QuantumCircuit:
-    """Create a simple variational form (ansatz) for the VQE algorithm."""
-    ansatz = TwoLocal(num_qubits=num_qubits, rotation_blocks=['ry', 'rz'], entanglement_blocks='cz', reps=1, entanglement='linear')
+    """Create a simple variational form (ansatz) for the VQE algorithm.
+    
+    The molecular Hamiltonian is real, so RY rotations (real amplitudes)
+    suffice and RZ layers would only add parameters for COBYLA to search.
+    The decomposed ansatz only uses RY/CZ, which Aer runs natively, so it is
+    built once and reused without a transpile.
+    """
+    ansatz = TwoLocal(num_qubits=num_qubits, rotation_blocks=['ry'], entanglement_blocks='cz', reps=1, entanglement='linear')
     # Bind the ansatz to concrete qubits
     ansatz = ansatz.decompose()
     return ansatz
 
 
-def run_vqe_demo(shots: int = 1024) -> Tuple[float, int]:
+def estimator_backend_options() -> dict:
+    """Return the AerSimulator options used by the GPU VQE estimator.
+
+    Like the shared sampling backend in `_sim`, the estimator simulates the
+    ansatz as a single-precision statevector, here on the GPU through
+    cuStateVec. Fusion is enabled from 3 qubits so the ansatz's RY/CZ layers
+    are merged into larger gates.
+    """
+    return {
+        "method": "statevector",
+        "precision": "single",
+        "device": "GPU",
+        "cuStateVec_enable": True,
+        "fusion_enable": True,
+        "fusion_threshold": 3,
+    }
+
+
+def create_estimator():
+    """Return the estimator VQE evaluates the Hamiltonian with.
+
+    Both choices compute exact expectation values from the final statevector
+    (no shot sampling). On the CPU `StatevectorEstimator` evaluates the small
+    ansatz in-process, without submitting an Aer job per call; Aer is used
+    when a GPU is available.
+    """
+    if gpu_available():
+        return Estimator(options={"backend_options": estimator_backend_options()})
+    return StatevectorEstimator()
+
+
+def run_vqe_demo(hamiltonian_source: str = "pyscf") -> Tuple[float, int]:
     """Run a VQE demo to compute the ground state energy of H2.
 
+    `hamiltonian_source` is passed to `get_h2_hamiltonian`. Energies are
+    exact expectation values, so there is no shot count.
+
     Returns:
         Tuple of (minimum eigenvalue, optimizer evaluations).
     """
-    hamiltonian = get_h2_hamiltonian()
+    hamiltonian = get_h2_hamiltonian(hamiltonian_source)
     num_qubits = hamiltonian.num_qubits
 
     ansatz = create_ansatz(num_qubits, reps=3)
 
-    # Initial parameters (random)
-    # initial_point = np.random.default_rng(42).uniform(-np.pi, np.pi, ansatz.num_parameters)
+    # Initial parameters: small angles, so the ansatz starts near |0...0⟩
+    initial_point = 0.1 * np.random.default_rng(INITIAL_POINT_SEED).standard_normal(ansatz.num_parameters)
 
     # Optimizer
     optimizer = COBYLA(maxiter=2000)
 
     # Backend
-    estimator = Estimator()
-    estimator.options.default_shots = shots
+    estimator = create_estimator()
 
     # VQE solver
     vqe = VQE(
         ansatz=ansatz,
         optimizer=optimizer,
         estimator=estimator,
+        initial_point=initial_point,
     )
 
     # Solve
@@ -89,15 +161,20 @@ def print_vqe_result(energy: float, evals: int) -> None:
 
 
 def main() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(description="Variational Quantum Eigensolver (VQE) demo for H2")
-    parser.add_argument("--shots", type=int, default=1024, help="Number of shots for simulation (>=1)")
+    parser.add_argument(
+        "--hamiltonian",
+        type=str,
+        choices=["toy", "pyscf"],
+        default="pyscf",
+        help="Use the precomputed 2-qubit Hamiltonian or compute the 4-qubit one with PySCF",
+    )
 
     args = parser.parse_args()
 
-    if args.shots <= 0:
-        raise SystemExit("--shots must be >= 1")
-
-    energy, evals = run_vqe_demo(shots=args.shots)
+    energy, evals = run_vqe_demo(hamiltonian_source=args.hamiltonian)
     print_vqe_result(energy, evals)
 
 